@@ -0,0 +1,179 @@
+import atexit
+import calendar
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import config
+import notifications
+import storage
+from fsutil import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+# Dedup key of one budget alert: a category reaching a level once per month
+def alert_key(year, month, category, level):
+    return f"budget:{year}-{month:02d}:{category}:{level}"
+
+# Months of sent-alert keys kept per user
+SENT_MONTHS = 12
+
+def alerts_sent_path(username):
+    return os.path.join(storage.base_dir, f'{username}_alerts_sent.json')
+
+# Push the entries (key, message, type) of one user's (year, month) alerts
+# that were never sent before. Sent keys are kept per month in
+# {username}_alerts_sent.json, apart from the bounded notification buffer, so
+# an alert the buffer has since dropped is not sent again.
+def _send_new(username, year, month, entries):
+    period = f"{year}-{month:02d}"
+    with storage.user_lock(username):
+        sent = storage.read_json(alerts_sent_path(username), {})
+        sent_keys = set(sent.get(period, []))
+        fresh = [entry for entry in entries if entry[0] not in sent_keys]
+        if not fresh:
+            return 0
+        added = notifications.add_unique_notifications(username, fresh)
+        sent[period] = sorted(sent_keys | {key for key, _, _ in fresh})
+        atomic_write_json(alerts_sent_path(username), {p: sent[p] for p in sorted(sent)[-SENT_MONTHS:]})
+    return len(added)
+
+def alert_message(year, month, category, level, percent, budget, overspend):
+    period = f"{calendar.month_name[month]} {year}"
+    if level == "overspent":
+        return f"Overspent on {category} by ₹{overspend:,} in {period}"
+    return f"{category} is at {percent:.0f}% of its ₹{budget:,} budget for {period}"
+
+# Evaluate one batch of users for a (year, month) period and push each new
+# near-limit or overspent category as a notification; returns how many were
+# added
+def check_users(usernames, year, month):
+    # numpy comes in with budgets, so it is only imported once checks run
+    import budgets
+    from finance import as_amount
+
+    evaluation = budgets.evaluate_users(usernames, [(year, month)])
+    entries = {}
+    for user, period, category in budgets.alerts(evaluation):
+        level = budgets.ALERT_LEVELS[evaluation["level"][user, period, category]]
+        name = storage.CATEGORIES[category]
+        message = alert_message(year, month, name, level, float(evaluation["percent"][user, period, category]),
+                                as_amount(evaluation["budget"][user, period, category]),
+                                as_amount(evaluation["overspend"][user, period, category]))
+        entries.setdefault(usernames[user], []).append(
+            (alert_key(year, month, name, level), message, "error" if level == "overspent" else "warning"))
+
+    return sum(_send_new(username, year, month, user_entries) for username, user_entries in entries.items())
+
+# Check the given users' current month right away, once queued expense saves
+# (SMARTSPEND_WRITE_BEHIND) have reached the rollups. The flush can block, so
+# this runs on the scheduler thread, never on a page.
+def check_now(usernames):
+    if config.WRITE_BEHIND:
+        from writequeue import get_write_queue
+        get_write_queue().flush(timeout=30)
+    now = datetime.now()
+    return check_users(sorted(usernames), now.year, now.month)
+
+# Check every profile (or the given users) for the current month, batch_size
+# users per evaluation, batches spread over at most workers threads
+def check_budgets(usernames=None, period=None, workers=None, batch_size=None):
+    usernames = list(usernames or storage.profile_usernames())
+    year, month = period or (datetime.now().year, datetime.now().month)
+    batch_size = batch_size or config.ALERT_BATCH_SIZE
+    batches = [usernames[i:i + batch_size] for i in range(0, len(usernames), batch_size)]
+    if not batches:
+        return 0
+    with ThreadPoolExecutor(max_workers=min(workers or config.ALERT_WORKERS, len(batches)),
+                            thread_name_prefix="budget-alerts") as pool:
+        return sum(pool.map(lambda batch: check_users(batch, year, month), batches))
+
+
+# Background budget checks: a thread that runs check_budgets for all users
+# every interval seconds, and sooner for users passed to request_check() (e.g.
+# right after they saved an expense). Alerts are deduplicated per user, month,
+# category and level, so repeated runs only notify about new crossings.
+class BudgetAlertScheduler:
+    def __init__(self, interval=config.ALERT_INTERVAL, workers=config.ALERT_WORKERS):
+        self.interval = interval
+        self.workers = workers
+        self._requested = set()
+        self._closed = False
+        self._next_run = time.monotonic()
+        self.last_run = None
+        self.last_added = 0
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="budget-alert-scheduler", daemon=True)
+        self._thread.start()
+
+    def request_check(self, username):
+        with self._condition:
+            self._requested.add(username)
+            self._condition.notify_all()
+
+    def close(self, timeout=None):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not (self._closed or self._requested or time.monotonic() >= self._next_run):
+                    self._condition.wait(self._next_run - time.monotonic())
+                if self._closed:
+                    return
+                full_run = time.monotonic() >= self._next_run
+                requested, self._requested = self._requested, set()
+                if full_run:
+                    self._next_run = time.monotonic() + self.interval
+
+            try:
+                if full_run:
+                    self.last_added = check_budgets(workers=self.workers)
+                else:
+                    self.last_added = check_now(requested)
+                self.last_run = datetime.now()
+            except Exception as e:
+                logger.exception("Budget alert check failed")
+                self.last_error = e
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# The process-wide scheduler, started on first use
+def start_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = BudgetAlertScheduler()
+            atexit.register(functools.partial(_scheduler.close, timeout=5))
+        return _scheduler
+
+def _check_user(username):
+    try:
+        now = datetime.now()
+        check_users([username], now.year, now.month)
+    except Exception:
+        logger.exception("Budget alert check for %s failed", username)
+
+# Ask the running scheduler to check a user soon. Without one (the scheduler
+# is off) the user is checked here, or with SMARTSPEND_WRITE_BEHIND by the
+# write queue once the user's queued expenses are written, so the page never
+# waits on disk.
+def request_check(username):
+    if _scheduler is not None:
+        _scheduler.request_check(username)
+    elif config.WRITE_BEHIND:
+        from writequeue import get_write_queue
+        get_write_queue().after_write(username, functools.partial(_check_user, username))
+    else:
+        _check_user(username)
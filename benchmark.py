@@ -0,0 +1,166 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import storage
+from sample_data import generate_history
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BENCH_USER = "bench"
+BENCH_PROFILE = {"Name": "Bench", "Age": 30, "Occupation": "Professional", "City_Tier": "Tier_1",
+                 "Income": 100000, "Dependents": 0, "Desired_Savings_Percentage": 20,
+                 "Financial_Goals": "", "Risk_Profile": "Moderate", "Has_Investments": False, "Has_Loans": False}
+
+
+# Best wall time of repeat calls to fn, run after setup (not timed) each time
+def _time(fn, repeat=1, setup=None):
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _result(case, records, seconds, operations=1):
+    return {"case": case, "records": records, "seconds": round(seconds, 6),
+            "per_operation": round(seconds / operations, 6), "operations": operations}
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Time the storage, history and analytics paths for one user holding records
+# expenses spread over months months
+def bench_history(records, months=60, seed=0, repeat=3, saves=100):
+    import frame
+
+    end = datetime(2025, 12, 28)
+    results = []
+    storage.save_user_profile(BENCH_PROFILE, BENCH_USER)
+
+    rows = list(generate_history(records, months, seed, end))
+    results.append(_result("bulk_save", records, _time(lambda: storage.save_expense_batch(BENCH_USER, rows))))
+    rows.clear()
+
+    def single_saves():
+        for i in range(saves):
+            storage.save_expenses({"Groceries": 100 + i, "notes": "bench"}, BENCH_USER, 12, 2025)
+    results.append(_result("save_expenses", records, _time(single_saves), saves))
+
+    cold = storage.file_cache.clear
+    results.append(_result("load_all_cold", records,
+                           _time(lambda: storage.get_all_user_expenses(BENCH_USER), repeat, cold)))
+    results.append(_result("load_all_warm", records,
+                           _time(lambda: storage.get_all_user_expenses(BENCH_USER), repeat)))
+    results.append(_result("load_month_cold", records,
+                           _time(lambda: storage.load_expenses(BENCH_USER, 6, 2025), repeat, cold)))
+    results.append(_result("query_range_cold", records,
+                           _time(lambda: storage.query_expenses(BENCH_USER, "2025-10", "2025-12"), repeat, cold)))
+    results.append(_result("recent_expenses", records,
+                           _time(lambda: storage.load_recent_expenses(BENCH_USER, 5), repeat, cold)))
+
+    results.append(_result("expense_frame_cold", records,
+                           _time(lambda: frame.get_expense_frame(BENCH_USER), repeat, cold)))
+    expense_frame = frame.get_expense_frame(BENCH_USER)
+
+    def history_filter():
+        filtered = frame.frame_between(expense_frame, "2025-01", "2025-12", ["Groceries"])
+        page = frame.page_after(filtered, None, 20)
+        frame.page_after(filtered, page["cursor"].iloc[-1], 20)
+    results.append(_result("history_filter", records, _time(history_filter, repeat)))
+
+    results.append(_result("analytics_frame", records,
+                           _time(lambda: frame.period_totals(frame.monthly_category_totals(expense_frame), "quarter"),
+                                 repeat)))
+    results.append(_result("analytics_rollup", records,
+                           _time(lambda: frame.period_totals(frame.rollup_monthly_totals(storage.load_rollup(BENCH_USER)),
+                                                             "quarter"), repeat, cold)))
+    return results
+
+# Time profile discovery and the all-user jobs over profiles users, each with
+# a short history
+def bench_profiles(profiles, records_per_user=24, seed=0, repeat=3):
+    import budgets
+    import reports
+
+    end = datetime(2025, 12, 28)
+    usernames = [f"user{i:06d}" for i in range(profiles)]
+
+    def create():
+        for i, username in enumerate(usernames):
+            storage.save_user_profile(dict(BENCH_PROFILE, Name=f"User {i}"), username)
+            storage.save_expense_batch(username, generate_history(records_per_user, 12, seed + i, end))
+    results = [_result("create_profiles", profiles, _time(create), profiles)]
+
+    cold = storage.file_cache.clear
+    results.append(_result("rebuild_registry", profiles, _time(storage.rebuild_user_registry, repeat)))
+    results.append(_result("search_users_cold", profiles,
+                           _time(lambda: storage.search_users("user 1", 0, 50), repeat, cold)))
+    results.append(_result("search_users_warm", profiles, _time(lambda: storage.search_users("user 1", 0, 50), repeat)))
+    results.append(_result("evaluate_budgets", profiles,
+                           _time(lambda: budgets.evaluate_users(usernames, [(2025, 12)]), repeat, cold), profiles))
+    results.append(_result("report", profiles,
+                           _time(lambda: sum(1 for _ in reports.iter_report(usernames, workers=1)), 1, cold), profiles))
+    return results
+
+# Run every benchmark in fresh temporary data directories and return a JSON-
+# serializable document; sizes are history lengths for one user, profiles the
+# number of users for the all-user cases (0 to skip them)
+def run_benchmarks(sizes=DEFAULT_SIZES, profiles=1000, backend=None, seed=0, repeat=3, months=60):
+    backend = backend or storage.storage_backend
+    previous = (storage.base_dir, storage.storage_backend, storage.sqlite_path)
+    started = datetime.now().isoformat(timespec="seconds")
+    results = []
+    try:
+        for records in sizes:
+            data_dir = tempfile.mkdtemp(prefix="smartspend-bench-")
+            try:
+                storage.configure(data_dir=data_dir, backend=backend)
+                results += bench_history(records, months, seed, repeat)
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+        if profiles:
+            data_dir = tempfile.mkdtemp(prefix="smartspend-bench-")
+            try:
+                storage.configure(data_dir=data_dir, backend=backend)
+                results += bench_profiles(profiles, seed=seed, repeat=repeat)
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        storage.configure(data_dir=previous[0], backend=previous[1], db_path=previous[2])
+
+    return {
+        "meta": {
+            "started": started,
+            "revision": _git_revision(),
+            "backend": backend,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def format_results(document):
+    lines = [f"{'case':22} {'records':>9} {'seconds':>10} {'per op':>10}"]
+    for result in document["results"]:
+        lines.append(f"{result['case']:22} {result['records']:>9} {result['seconds']:>10.4f} {result['per_operation']:>10.6f}")
+    return "\n".join(lines)
+
+def write_results(document, path):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
@@ -0,0 +1,284 @@
+import calendar
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+
+from storage import CATEGORIES
+from fsutil import sync
+
+# File header identifying the record layout below
+MAGIC = b"SMARTSPEND-EXP1\n"
+
+# One fixed-width, unaligned record per expense: the 16 bytes of its UUID,
+# its period, the timestamp as seconds since the epoch (NO_TIMESTAMP when the
+# record has none) and one float64 amount per category in CATEGORIES order
+RECORD_DTYPE = np.dtype([
+    ("id", "V16"),
+    ("year", "<i2"),
+    ("month", "u1"),
+    ("timestamp", "<i8"),
+    ("amounts", "<f8", (len(CATEGORIES),)),
+])
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+# Records encoded per write while streaming a batch
+WRITE_CHUNK = 10000
+
+
+def _id_bytes(expense_id):
+    try:
+        return uuid.UUID(expense_id).bytes
+    except ValueError:
+        # Ids that are not UUIDs get a stable name-based one
+        return uuid.uuid5(uuid.NAMESPACE_OID, str(expense_id)).bytes
+
+def _epoch(timestamp):
+    if not timestamp:
+        return NO_TIMESTAMP
+    try:
+        return calendar.timegm(time.strptime(timestamp, "%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        return NO_TIMESTAMP
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UUID_HEX_POSITIONS = np.r_[0:8, 9:13, 14:18, 19:23, 24:36]
+
+# Canonical UUID strings for an array of 16-byte ids, formatted with NumPy
+# instead of one uuid.UUID object per record
+def id_strings(raw_ids):
+    raw = np.ascontiguousarray(raw_ids).view(np.uint8).reshape(-1, 16)
+    digits = np.empty((len(raw), 32), dtype=np.uint8)
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 15]
+    text = np.full((len(raw), 36), ord('-'), dtype=np.uint8)
+    text[:, _UUID_HEX_POSITIONS] = digits
+    return text.view('S36').ravel().astype(str)
+
+# "YYYY-MM-DD HH:MM:SS" strings for datetime64 values (or epoch seconds),
+# without per-row strftime
+def timestamp_strings(values):
+    text = np.datetime_as_string(np.asarray(values).astype("datetime64[s]"), unit="s").astype("S19")
+    text.view(np.uint8).reshape(-1, 19)[:, 10] = ord(" ")
+    return text.astype(str)
+
+def _amount(value):
+    return int(value) if value.is_integer() else value
+
+# (year, month, id, record) rows for a structured record array, in the shape
+# iter_records yields; ids and timestamps are formatted for the whole array
+def decode_records(records, notes=None):
+    notes = notes or {}
+    ids = id_strings(records["id"])
+    epochs = records["timestamp"]
+    missing = epochs == NO_TIMESTAMP
+    timestamps = timestamp_strings(np.where(missing, 0, epochs)).tolist()
+    years = records["year"].tolist()
+    months = records["month"].tolist()
+    amounts = records["amounts"].tolist()
+    for i, expense_id in enumerate(ids.tolist()):
+        record = {category: _amount(amount) for category, amount in zip(CATEGORIES, amounts[i])}
+        if expense_id in notes:
+            record['notes'] = notes[expense_id]
+        if not missing[i]:
+            record['timestamp'] = timestamps[i]
+        yield str(years[i]), str(months[i]), expense_id, record
+
+
+# Monthly category rollup (see storage.add_to_rollup) of a structured record
+# array, reduced per period with NumPy
+def array_rollup(records):
+    rollup = {}
+    if not len(records):
+        return rollup
+    periods = records["year"].astype(np.int64) * 100 + records["month"]
+    order = np.argsort(periods, kind="stable")
+    periods = periods[order]
+    amounts = records["amounts"][order]
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    counts = np.diff(np.r_[starts, len(periods)]).tolist()
+    sums = np.add.reduceat(amounts, starts).tolist()
+    mins = np.minimum.reduceat(amounts, starts).tolist()
+    maxs = np.maximum.reduceat(amounts, starts).tolist()
+    for i, period in enumerate(periods[starts].tolist()):
+        rollup.setdefault(str(period // 100), {})[str(period % 100)] = {
+            category: {"sum": _amount(sums[i][j]), "count": counts[i],
+                       "min": _amount(mins[i][j]), "max": _amount(maxs[i][j])}
+            for j, category in enumerate(CATEGORIES)
+        }
+    return rollup
+
+
+# Expense storage in fixed-width binary records, one file per user and year
+# ({username}_records/YEAR.bin, a header followed by RECORD_DTYPE rows) that
+# are read by memory-mapping them as NumPy structured arrays. Saving appends
+# records to the year's file; a record saved again under the same id replaces
+# the earlier one. Notes, the only variable-length field, are appended to a
+# YEAR.notes.jsonl file next to it; other extra record keys are not kept.
+class BinaryExpenseStore:
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def user_dir(self, username):
+        return os.path.join(self.data_dir, f'{username}_records')
+
+    def records_path(self, username, year):
+        return os.path.join(self.user_dir(username), f'{year}.bin')
+
+    def notes_path(self, username, year):
+        return os.path.join(self.user_dir(username), f'{year}.notes.jsonl')
+
+    def years(self, username):
+        try:
+            names = os.listdir(self.user_dir(username))
+        except FileNotFoundError:
+            return []
+        return sorted((name[:-len('.bin')] for name in names if name.endswith('.bin')), key=int)
+
+    def signature_paths(self, username, year=None):
+        years = [year] if year is not None else self.years(username)
+        paths = [] if year is not None else [self.user_dir(username)]
+        for shard_year in years:
+            paths += [self.records_path(username, shard_year), self.notes_path(username, shard_year)]
+        return paths
+
+    # Memory-mapped records of one year, without a torn trailing record
+    def _map_year(self, username, year):
+        path = self.records_path(username, year)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        count = (size - len(MAGIC)) // RECORD_DTYPE.itemsize
+        if count <= 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a SmartSpend record file")
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=len(MAGIC), shape=(count,))
+
+    def _read_notes(self, username, year):
+        notes = {}
+        path = self.notes_path(username, year)
+        if not os.path.exists(path):
+            return notes
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                notes[entry['id']] = entry['notes']
+        return notes
+
+    # Records of the given years (default all) as one structured array, the
+    # latest copy of each id only, plus the notes keyed by id string. A single
+    # year with no re-saved ids is returned as the memory-mapped file itself.
+    def load_array(self, username, years=None):
+        years = self.years(username) if years is None else [str(year) for year in years]
+        arrays = [self._map_year(username, year) for year in years]
+        arrays = [array for array in arrays if len(array)]
+        notes = {}
+        for year in years:
+            notes.update(self._read_notes(username, year))
+        if not arrays:
+            return np.empty(0, dtype=RECORD_DTYPE), notes
+        records = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+        ids = records["id"]
+        _, last = np.unique(ids[::-1], return_index=True)
+        if len(last) < len(records):
+            records = records[np.sort(len(records) - 1 - last)]
+        return records, notes
+
+    def iter_records(self, username):
+        for year in self.years(username):
+            yield from decode_records(*self.load_array(username, [year]))
+
+    def load_tree(self, username):
+        all_expenses = {}
+        for year, month, expense_id, record in self.iter_records(username):
+            all_expenses.setdefault(year, {}).setdefault(month, {})[expense_id] = record
+        return all_expenses
+
+    def load_range(self, username, start=None, end=None):
+        years = [year for year in self.years(username)
+                 if (start is None or int(year) >= start[0]) and (end is None or int(year) <= end[0])]
+        records, notes = self.load_array(username, years)
+        periods = records["year"].astype(np.int64) * 100 + records["month"]
+        mask = np.ones(len(records), dtype=bool)
+        if start is not None:
+            mask &= periods >= start[0] * 100 + start[1]
+        if end is not None:
+            mask &= periods <= end[0] * 100 + end[1]
+        all_expenses = {}
+        for year, month, expense_id, record in decode_records(records[mask], notes):
+            all_expenses.setdefault(year, {}).setdefault(month, {})[expense_id] = record
+        return all_expenses
+
+    def load_month(self, username, year, month):
+        return self.load_range(username, (int(year), int(month)), (int(year), int(month))).get(str(year), {}).get(str(month), {})
+
+    def save(self, username, year, month, expense_id, record):
+        self.save_many([(username, year, month, expense_id, record)])
+
+    def _open_records(self, path):
+        f = open(path, 'a+b')
+        size = f.seek(0, os.SEEK_END)
+        if size < len(MAGIC):
+            f.truncate(0)
+            f.write(MAGIC)
+        else:
+            # Drop a record torn by an interrupted append
+            whole = len(MAGIC) + (size - len(MAGIC)) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            if whole != size:
+                f.truncate(whole)
+        return f
+
+    # Callers hold the user's lock (see storage.user_lock())
+    def save_many(self, rows):
+        handles, notes_handles, pending = {}, {}, {}
+
+        def flush(shard):
+            handles[shard].write(np.array(pending.pop(shard), dtype=RECORD_DTYPE).tobytes())
+
+        try:
+            for username, year, month, expense_id, record in rows:
+                shard = (username, str(year))
+                if shard not in handles:
+                    os.makedirs(self.user_dir(username), exist_ok=True)
+                    handles[shard] = self._open_records(self.records_path(*shard))
+                id_bytes = _id_bytes(expense_id)
+                amounts = tuple(float(record.get(category, 0) or 0) for category in CATEGORIES)
+                pending.setdefault(shard, []).append(
+                    (id_bytes, int(year), int(month), _epoch(record.get('timestamp')), amounts))
+                if record.get('notes'):
+                    if shard not in notes_handles:
+                        notes_handles[shard] = open(self.notes_path(*shard), 'a')
+                    entry = {"id": str(uuid.UUID(bytes=id_bytes)), "notes": record['notes']}
+                    notes_handles[shard].write(json.dumps(entry) + "\n")
+                if len(pending[shard]) >= WRITE_CHUNK:
+                    flush(shard)
+            for shard in list(pending):
+                flush(shard)
+            for f in list(notes_handles.values()) + list(handles.values()):
+                sync(f)
+        finally:
+            for f in list(notes_handles.values()) + list(handles.values()):
+                f.close()
+
+    # Append a whole structured record array (e.g. from
+    # sample_data.generate_records) without encoding it row by row. Callers
+    # hold the user's lock.
+    def save_array(self, username, records):
+        os.makedirs(self.user_dir(username), exist_ok=True)
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        for year in np.unique(records["year"]).tolist():
+            with self._open_records(self.records_path(username, year)) as f:
+                f.write(records[records["year"] == year].tobytes())
+                sync(f)
+
+    def usernames(self):
+        return sorted(f[:-len('_records')] for f in os.listdir(self.data_dir) if f.endswith('_records'))
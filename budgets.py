@@ -0,0 +1,80 @@
+import numpy as np
+
+import storage
+from storage import CATEGORIES
+from finance import default_budget_goals
+from tracing import traced
+
+# Alert levels, in increasing severity
+ALERT_OK = 0
+ALERT_NEAR_LIMIT = 1
+ALERT_OVERSPENT = 2
+ALERT_LEVELS = ["ok", "near_limit", "overspent"]
+
+# Spending above this share of a budget (in percent) counts as near the limit
+NEAR_LIMIT_PERCENT = 90
+
+
+# Category amounts from a {category: amount} dict as an array in CATEGORIES order
+def category_vector(amounts):
+    return np.array([amounts.get(category, 0) or 0 for category in CATEGORIES], dtype=np.float64)
+
+# A user's saved budget goals, or the profile-based defaults when none are saved
+def user_budget_goals(username, profile=None):
+    budget_goals = storage.load_budget_goals(username)
+    if not budget_goals:
+        profile = profile or storage.load_user_profile(username)
+        budget_goals = default_budget_goals(profile) if profile else {}
+    return budget_goals
+
+# Evaluate spending against budgets in one pass. spent and budgets are arrays
+# whose last axis is the category (or scalars for a single total) and broadcast
+# against each other, e.g. spent of shape (users, months, categories) with
+# budgets of shape (users, 1, categories). A zero budget has 0% used and never
+# raises an alert, but spending against it still counts as overspend.
+@traced("budgets.evaluate_budgets")
+def evaluate_budgets(spent, budgets, near_limit=NEAR_LIMIT_PERCENT):
+    spent = np.asarray(spent, dtype=np.float64)
+    budgets = np.asarray(budgets, dtype=np.float64)
+    spent, budgets = np.broadcast_arrays(spent, budgets)
+
+    percent = np.divide(spent * 100, budgets, out=np.zeros(spent.shape), where=budgets > 0)
+    level = np.full(spent.shape, ALERT_OK, dtype=np.int8)
+    level[percent > near_limit] = ALERT_NEAR_LIMIT
+    level[percent > 100] = ALERT_OVERSPENT
+    return {
+        "spent": spent,
+        "budget": budgets,
+        "percent": percent,
+        "remaining": budgets - spent,
+        "overspend": np.maximum(spent - budgets, 0),
+        "level": level,
+    }
+
+# (users, categories) array of budget goals
+def budget_matrix(usernames):
+    budgets = np.zeros((len(usernames), len(CATEGORIES)))
+    for row, username in enumerate(usernames):
+        budgets[row] = category_vector(user_budget_goals(username))
+    return budgets
+
+# (users, periods, categories) array of spending per (year, month) period,
+# read from each user's rollup
+def spending_matrix(usernames, periods):
+    spent = np.zeros((len(usernames), len(periods), len(CATEGORIES)))
+    for row, username in enumerate(usernames):
+        rollup = storage.load_rollup(username)
+        for column, (year, month) in enumerate(periods):
+            spent[row, column] = category_vector(storage.rollup_category_totals(rollup, year, month))
+    return spent
+
+# Evaluate every given user's budgets for each (year, month) in periods; the
+# arrays are indexed [user, period, category] in the order given
+@traced("budgets.evaluate_users")
+def evaluate_users(usernames, periods, near_limit=NEAR_LIMIT_PERCENT):
+    return evaluate_budgets(spending_matrix(usernames, periods), budget_matrix(usernames)[:, np.newaxis, :],
+                            near_limit)
+
+# (user, period, category) index triples at or above the given alert level
+def alerts(evaluation, min_level=ALERT_NEAR_LIMIT):
+    return np.argwhere(evaluation["level"] >= min_level)
@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+# Signature of a set of files: (mtime, size) per path, None for missing files.
+# A cached value is reused only while the signature of its files is unchanged.
+def file_signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+# Rough in-memory size of a loaded JSON-like value
+def estimate_size(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+# Process-wide LRU cache of parsed files, shared by every Streamlit session.
+# Entries are keyed by (group, key) so that a save can drop everything derived
+# from one user's file at once. Cached values are shared between callers and
+# must be treated as read-only.
+class FileCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, group, key, paths, loader):
+        signature = file_signature(paths)
+        cache_key = (group, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        size = estimate_size(value)
+        with self._lock:
+            self._discard(cache_key)
+            if size <= self.max_bytes:
+                self._entries[cache_key] = (signature, value, size)
+                self._total_bytes += size
+                self._evict()
+        return value
+
+    def invalidate(self, group):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == group]:
+                self._discard(cache_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+    def _discard(self, cache_key):
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry[2]
@@ -0,0 +1,110 @@
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import config
+from tracing import span, traced
+
+# Plotly figures for the Dashboard and Analytics pages. Each builder takes its
+# aggregates as plain tuples so st.cache_resource can key the figure on their
+# contents: reruns and other sessions showing the same numbers get the already
+# built figure back. The returned figures are shared, so callers must not
+# modify them.
+figure_cache = st.cache_resource(max_entries=config.FIGURE_CACHE_SIZE, show_spinner=False)
+
+
+# Render a figure into the page, timed as chart.render.<name> (serializing
+# the figure happens here)
+def plot(name, fig):
+    with span(f"chart.render.{name}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# Pie of category totals; categories and amounts are parallel tuples
+@traced("chart.build.expense_pie")
+@figure_cache
+def expense_pie(categories, amounts):
+    return px.pie(names=list(categories), values=list(amounts), title="Expense Distribution",
+                  labels={"names": "Category", "values": "Amount"})
+
+# Bar of the largest categories, already sorted by the caller
+@traced("chart.build.top_categories_bar")
+@figure_cache
+def top_categories_bar(categories, amounts):
+    return px.bar(x=list(categories), y=list(amounts), title="Top Spending Categories",
+                  labels={"x": "Category", "y": "Amount"})
+
+# Line of total spending per period (month, quarter, ...), in the order given
+@traced("chart.build.monthly_trend_line")
+@figure_cache
+def monthly_trend_line(months, totals, title="Total Monthly Expenses"):
+    fig = px.line(x=list(months), y=list(totals), title=title,
+                  labels={"y": "Expense (₹)", "x": ""}, markers=True)
+    fig.update_layout(xaxis={'categoryorder': 'array', 'categoryarray': list(months)})
+    return fig
+
+# Stacked bar of category spending per period; amounts holds one tuple of
+# per-period values for each category
+@traced("chart.build.category_stacked_bar")
+@figure_cache
+def category_stacked_bar(months, categories, amounts, title="Monthly Spending by Category"):
+    fig = go.Figure([go.Bar(x=list(months), y=list(values), name=category)
+                     for category, values in zip(categories, amounts)])
+    fig.update_layout(title=title, barmode="stack",
+                      xaxis={'categoryorder': 'array', 'categoryarray': list(months)},
+                      yaxis={'title': "Expense (₹)"}, legend_title_text="Category")
+    return fig
+
+# Horizontal bar of average spending per category
+@traced("chart.build.category_average_bar")
+@figure_cache
+def category_average_bar(categories, averages):
+    return px.bar(y=list(categories), x=list(averages), title="Average Monthly Spending by Category",
+                  labels={"x": "Average Expense (₹)", "y": "Category"}, orientation="h")
+
+# Savings amount and percentage per period against the target percentage
+@traced("chart.build.savings_figure")
+@figure_cache
+def savings_figure(months, savings, savings_percent, target):
+    months = list(months)
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=list(savings),
+        name="Savings (₹)",
+        line=dict(color="green", width=3),
+        mode="lines+markers"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=list(savings_percent),
+        name="Savings %",
+        line=dict(color="blue", width=3, dash="dot"),
+        mode="lines+markers",
+        yaxis="y2"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=[target] * len(months),
+        name="Target Savings %",
+        line=dict(color="red", width=2, dash="dash"),
+        yaxis="y2"
+    ))
+
+    fig.update_layout(
+        title="Monthly Savings Analysis",
+        yaxis=dict(title="Savings (₹)", side="left"),
+        yaxis2=dict(
+            title="Savings %",
+            side="right",
+            overlaying="y",
+            tickmode="auto",
+            range=[0, max(max(savings_percent) * 1.1, target * 1.2)]
+        ),
+        legend=dict(x=0.05, y=1, traceorder="normal"),
+        hovermode="x unified"
+    )
+    return fig
@@ -0,0 +1,261 @@
+import argparse
+import os
+import sys
+
+import storage
+
+
+def cmd_migrate_sqlite(args):
+    migrated = storage.migrate_json_to_sqlite(db_path=args.db)
+    for username, count in migrated.items():
+        print(f"{username}: {count} expense records")
+    print(f"Migrated {sum(migrated.values())} records for {len(migrated)} users into {args.db or storage.sqlite_path}")
+
+
+def cmd_migrate_binary(args):
+    migrated = storage.migrate_json_to_binary()
+    for username, count in migrated.items():
+        print(f"{username}: {count} expense records")
+    print(f"Migrated {sum(migrated.values())} records for {len(migrated)} users into binary record files")
+
+
+def cmd_rebuild_rollups(args):
+    usernames = args.users or storage.get_store().usernames()
+    for username in usernames:
+        storage.rebuild_rollup(username)
+    print(f"Rebuilt monthly rollups for {len(usernames)} users")
+
+
+def cmd_rebuild_registry(args):
+    registry = storage.rebuild_user_registry()
+    print(f"Registered {len(registry)} user profiles")
+
+
+def _parse_mapping(pairs):
+    mapping = {}
+    for pair in pairs or []:
+        source, _, category = pair.partition("=")
+        if not category:
+            raise SystemExit(f"Invalid --map value {pair!r}; expected SOURCE=CATEGORY")
+        mapping[source] = category
+    return mapping
+
+
+def cmd_import(args):
+    import importer
+    fmt = args.format or importer.detect_format(args.file)
+    result = importer.import_expenses(args.user, args.file, fmt,
+                                      date_column=args.date_column,
+                                      mapping=_parse_mapping(args.map),
+                                      category_column=args.category_column,
+                                      amount_column=args.amount_column,
+                                      notes_column=args.notes_column,
+                                      absolute=args.abs,
+                                      chunk_size=args.chunk_size)
+    print(f"Imported {result.imported} records for {args.user}, skipped {result.skipped}")
+    for error in result.errors:
+        print(f"  {error}")
+
+
+def cmd_export(args):
+    import exporter
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+    if fmt not in exporter.EXPORT_FORMATS:
+        raise SystemExit(f"Unsupported export format {fmt!r}; use --format csv, jsonl or parquet")
+    count = exporter.export_to_path(args.user, fmt, args.file)
+    print(f"Exported {count} records for {args.user} to {args.file}")
+
+
+def cmd_check_budgets(args):
+    import json
+    from datetime import datetime
+    import budgets
+    now = datetime.now()
+    year, month = args.year or now.year, args.month or now.month
+    usernames = args.users or storage.profile_usernames()
+    evaluation = budgets.evaluate_users(usernames, [(year, month)])
+    found = [{"user": usernames[user], "year": year, "month": month, "category": storage.CATEGORIES[category],
+              "level": budgets.ALERT_LEVELS[evaluation["level"][user, period, category]],
+              "percent": round(float(evaluation["percent"][user, period, category]), 1),
+              "overspend": round(float(evaluation["overspend"][user, period, category]), 2)}
+             for user, period, category in budgets.alerts(evaluation)]
+    if args.json:
+        print(json.dumps(found, indent=2))
+        return
+    for alert in found:
+        print(f"{alert['user']}: {alert['category']} {alert['level']} ({alert['percent']}% of budget)")
+    print(f"{len(found)} budget alerts for {len(usernames)} users in {year}-{month:02d}")
+
+
+def cmd_budget_alerts(args):
+    import time
+    import alerts
+    if bool(args.year) != bool(args.month):
+        raise SystemExit("--year and --month must be given together")
+    period = (args.year, args.month) if args.year else None
+    while True:
+        added = alerts.check_budgets(args.users, period, args.workers)
+        print(f"Added {added} budget alert notifications")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+def cmd_report(args):
+    import reports
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+    if fmt not in ("csv", "jsonl"):
+        raise SystemExit(f"Unsupported report format {fmt!r}; use --format csv or jsonl")
+    if bool(args.year) != bool(args.month):
+        raise SystemExit("--year and --month must be given together")
+    period = (args.year, args.month) if args.year else None
+    count = reports.generate_report(args.file, fmt, args.users, period, args.workers)
+    print(f"Wrote {count} report rows to {args.file}")
+
+
+def cmd_benchmark(args):
+    import json
+    import benchmark
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    document = benchmark.run_benchmarks(sizes, args.profiles, args.backend, args.seed, args.repeat, args.months)
+    if args.output:
+        benchmark.write_results(document, args.output)
+        print(f"Wrote {len(document['results'])} results to {args.output}")
+    if args.json:
+        print(json.dumps(document))
+    elif not args.output:
+        print(benchmark.format_results(document))
+
+
+def cmd_generate(args):
+    from sample_data import generate_records
+    records = generate_records(args.records, args.months, args.seed)
+    count = storage.save_expense_array(args.user, records)
+    print(f"Generated {count} records for {args.user} over {args.months} months")
+
+
+def cmd_import_times(args):
+    import json
+    import subprocess
+    import views
+
+    # Each module is timed in a fresh interpreter so nothing is already imported
+    probe = "import sys, time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    modules = {"app dependencies": "streamlit, streamlit_option_menu, storage, views, ui"}
+    modules.update(views.PAGES)
+    results = {}
+    for name, module in modules.items():
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run([sys.executable, "-c", probe.format(module=module)],
+                                    capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+            runs.append(float(output.stdout.strip().splitlines()[-1]))
+        results[name] = round(min(runs) * 1000, 1)
+
+    if args.json:
+        print(json.dumps({"import_ms": results}))
+    else:
+        for name, ms in results.items():
+            print(f"{name:20} {ms:8.1f} ms")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="smartspend", description="SmartSpend command line tools")
+    parser.add_argument("--data-dir", help="Directory holding the user data files (default: SMARTSPEND_DATA_DIR)")
+    parser.add_argument("--backend", choices=["json", "sqlite", "binary"], help="Expense storage backend (default: SMARTSPEND_STORAGE)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate-sqlite", help="Copy JSON expense files into the SQLite store")
+    migrate.add_argument("--db", help="SQLite database path (default: <data-dir>/smartspend.db)")
+    migrate.set_defaults(func=cmd_migrate_sqlite)
+
+    migrate_binary = subparsers.add_parser("migrate-binary", help="Copy JSON expense files into binary record files")
+    migrate_binary.set_defaults(func=cmd_migrate_binary)
+
+    rollups = subparsers.add_parser("rebuild-rollups", help="Recompute the monthly category rollups from stored expenses")
+    rollups.add_argument("users", nargs="*", help="Users to rebuild (default: all)")
+    rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    registry = subparsers.add_parser("rebuild-registry", help="Rebuild the user registry from the profile files")
+    registry.set_defaults(func=cmd_rebuild_registry)
+
+    imports = subparsers.add_parser("import", help="Bulk import expenses from a CSV or Parquet export")
+    imports.add_argument("user", help="User to import expenses for")
+    imports.add_argument("file", help="CSV or Parquet file")
+    imports.add_argument("--format", choices=["csv", "parquet"], help="File format (default: from the extension)")
+    imports.add_argument("--date-column", default="date", help="Column holding the transaction date")
+    imports.add_argument("--map", action="append", metavar="SOURCE=CATEGORY",
+                         help="Map a source column (or, with --category-column, a category value) to a category")
+    imports.add_argument("--category-column", help="Column naming each row's category (one amount per row)")
+    imports.add_argument("--amount-column", default="amount", help="Amount column used with --category-column")
+    imports.add_argument("--notes-column", help="Column copied into the expense notes")
+    imports.add_argument("--abs", action="store_true", help="Treat negative amounts (debits) as spending and skip positive ones (credits)")
+    imports.add_argument("--chunk-size", type=int, default=50000, help="Rows read per chunk")
+    imports.set_defaults(func=cmd_import)
+
+    exports = subparsers.add_parser("export", help="Export a user's expense history to CSV, JSONL or Parquet")
+    exports.add_argument("user", help="User to export")
+    exports.add_argument("file", help="Output file")
+    exports.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="Output format (default: from the extension)")
+    exports.set_defaults(func=cmd_export)
+
+    check = subparsers.add_parser("check-budgets", help="Report categories near or over budget for every user")
+    check.add_argument("users", nargs="*", help="Users to check (default: every profile)")
+    check.add_argument("--year", type=int, help="Year to check (default: current)")
+    check.add_argument("--month", type=int, choices=range(1, 13), metavar="MONTH", help="Month to check (default: current)")
+    check.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    check.set_defaults(func=cmd_check_budgets)
+
+    budget_alerts = subparsers.add_parser("budget-alerts", help="Notify users about categories near or over budget")
+    budget_alerts.add_argument("users", nargs="*", help="Users to check (default: every profile)")
+    budget_alerts.add_argument("--year", type=int, help="Year to check (with --month; default: current)")
+    budget_alerts.add_argument("--month", type=int, choices=range(1, 13), metavar="MONTH", help="Month to check (with --year)")
+    budget_alerts.add_argument("--workers", type=int, help="Worker threads (default: SMARTSPEND_ALERT_WORKERS)")
+    budget_alerts.add_argument("--interval", type=float, help="Keep running, checking every this many seconds")
+    budget_alerts.set_defaults(func=cmd_budget_alerts)
+
+    report = subparsers.add_parser("report", help="Write monthly totals, savings and budget status for every user")
+    report.add_argument("file", help="Output file")
+    report.add_argument("users", nargs="*", help="Users to include (default: every profile)")
+    report.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from the extension)")
+    report.add_argument("--year", type=int, help="Only report this year (with --month)")
+    report.add_argument("--month", type=int, choices=range(1, 13), metavar="MONTH", help="Only report this month (with --year)")
+    report.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    report.set_defaults(func=cmd_report)
+
+    bench = subparsers.add_parser("benchmark", help="Time storage, history and analytics on synthetic data")
+    bench.add_argument("--sizes", default="1000,10000,100000",
+                       help="Comma-separated history sizes for the single-user cases (e.g. 1000,1000000)")
+    bench.add_argument("--profiles", type=int, default=1000, help="Users for the all-user cases (0 to skip)")
+    bench.add_argument("--months", type=int, default=60, help="Months the synthetic history spans")
+    bench.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data")
+    bench.add_argument("--repeat", type=int, default=3, help="Runs per read case; the fastest is reported")
+    bench.add_argument("--output", help="Write the results as JSON to this file")
+    bench.add_argument("--json", action="store_true", help="Print the results as JSON")
+    bench.set_defaults(func=cmd_benchmark)
+
+    generate = subparsers.add_parser("generate", help="Write a synthetic expense history for a user (load testing)")
+    generate.add_argument("user", help="User to generate expenses for")
+    generate.add_argument("--records", type=int, default=100000, help="Number of records")
+    generate.add_argument("--months", type=int, default=24, help="Months the history spans, ending now")
+    generate.add_argument("--seed", type=int, help="Seed for repeatable data")
+    generate.set_defaults(func=cmd_generate)
+
+    import_times = subparsers.add_parser("import-times", help="Measure cold import time of the app and each page")
+    import_times.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported")
+    import_times.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    import_times.set_defaults(func=cmd_import_times)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    storage.configure(data_dir=args.data_dir, backend=args.backend)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import os
+
+# Runtime settings, overridable through environment variables
+
+# Directory holding the per-user profile, expense and budget files
+BASE_DIR = os.environ.get("SMARTSPEND_DATA_DIR", "/home/nhance-dev/Projects/SmartSpend")
+
+# Expense storage backend: "json" (snapshot + journal files), "sqlite" or
+# "binary" (memory-mapped fixed-width records, needs NumPy)
+STORAGE_BACKEND = os.environ.get("SMARTSPEND_STORAGE", "json")
+
+# SQLite database file used by the sqlite backend
+SQLITE_PATH = os.environ.get("SMARTSPEND_SQLITE_PATH", os.path.join(BASE_DIR, "smartspend.db"))
+
+# Size at which the JSON expense journal is folded back into its snapshot
+JOURNAL_COMPACT_BYTES = int(os.environ.get("SMARTSPEND_JOURNAL_COMPACT_BYTES", 256 * 1024))
+
+# Process-wide cache of parsed user files
+CACHE_MAX_ENTRIES = int(os.environ.get("SMARTSPEND_CACHE_MAX_ENTRIES", 512))
+CACHE_MAX_BYTES = int(os.environ.get("SMARTSPEND_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+# Number of newest expenses kept in each user's recent-activity index
+RECENT_INDEX_SIZE = int(os.environ.get("SMARTSPEND_RECENT_INDEX_SIZE", 50))
+
+# Expense History entries shown per "Load more" step
+HISTORY_PAGE_SIZE = int(os.environ.get("SMARTSPEND_HISTORY_PAGE_SIZE", 20))
+
+# fsync journal appends and file replacements before reporting a save as done
+FSYNC_WRITES = os.environ.get("SMARTSPEND_FSYNC", "1") != "0"
+
+# Queue expense saves and write them from a background thread in batches
+WRITE_BEHIND = os.environ.get("SMARTSPEND_WRITE_BEHIND", "0") == "1"
+WRITE_BATCH_SIZE = int(os.environ.get("SMARTSPEND_WRITE_BATCH_SIZE", 500))
+WRITE_FLUSH_SECONDS = float(os.environ.get("SMARTSPEND_WRITE_FLUSH_SECONDS", 0.5))
+# Failed writes of a user's batch before its rows are parked for a later retry
+WRITE_MAX_RETRIES = int(os.environ.get("SMARTSPEND_WRITE_MAX_RETRIES", 5))
+
+# Number of built Plotly figures kept for reuse across reruns and sessions
+FIGURE_CACHE_SIZE = int(os.environ.get("SMARTSPEND_FIGURE_CACHE_SIZE", 128))
+
+# Most points drawn per series on the Analytics trend charts
+CHART_MAX_POINTS = int(os.environ.get("SMARTSPEND_CHART_MAX_POINTS", 120))
+
+# Profiles listed per page in the sidebar profile picker
+PROFILE_PAGE_SIZE = int(os.environ.get("SMARTSPEND_PROFILE_PAGE_SIZE", 50))
+
+# Timing instrumentation: SMARTSPEND_TRACE=1 records spans around storage
+# calls, aggregations and charts; SMARTSPEND_TRACE_FILE also appends each span
+# to a JSONL file; SMARTSPEND_DEV_PANEL=1 shows the timings in the app
+TRACE = os.environ.get("SMARTSPEND_TRACE", "0") == "1"
+TRACE_FILE = os.environ.get("SMARTSPEND_TRACE_FILE") or None
+DEV_PANEL = os.environ.get("SMARTSPEND_DEV_PANEL", "0") == "1"
+TRACE_BUFFER_SIZE = int(os.environ.get("SMARTSPEND_TRACE_BUFFER_SIZE", 10000))
+
+# Notifications kept per user (oldest dropped first) and shown per page
+NOTIFICATION_LIMIT = int(os.environ.get("SMARTSPEND_NOTIFICATION_LIMIT", 200))
+NOTIFICATION_PAGE_SIZE = int(os.environ.get("SMARTSPEND_NOTIFICATION_PAGE_SIZE", 20))
+
+# Background budget alerts: every ALERT_INTERVAL seconds (0 turns the
+# scheduler off) all users are checked in batches of ALERT_BATCH_SIZE on up to
+# ALERT_WORKERS threads
+ALERT_INTERVAL = float(os.environ.get("SMARTSPEND_ALERT_INTERVAL", 300))
+ALERT_WORKERS = int(os.environ.get("SMARTSPEND_ALERT_WORKERS", 2))
+ALERT_BATCH_SIZE = int(os.environ.get("SMARTSPEND_ALERT_BATCH_SIZE", 200))
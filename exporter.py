@@ -0,0 +1,85 @@
+import csv
+import json
+import os
+import tempfile
+
+import storage
+from storage import CATEGORIES
+
+EXPORT_COLUMNS = ["id", "year", "month", "timestamp"] + CATEGORIES + ["notes"]
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+PARQUET_BATCH_SIZE = 50000
+
+
+# One flat row per expense, in EXPORT_COLUMNS order
+def iter_export_rows(username):
+    for year, month, expense_id, record in storage.iter_expense_records(username):
+        yield [expense_id, int(year), int(month), record.get('timestamp', "")] + \
+              [record.get(category, 0) for category in CATEGORIES] + [record.get('notes', "")]
+
+def write_csv(rows, f):
+    writer = csv.writer(f)
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+
+def write_jsonl(rows, f):
+    for row in rows:
+        f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n")
+
+# Parquet is written in row groups of PARQUET_BATCH_SIZE so only one batch is
+# held in memory at a time
+def write_parquet(rows, f):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("id", pa.string()), ("year", pa.int32()), ("month", pa.int8()), ("timestamp", pa.string())] +
+                       [(category, pa.float64()) for category in CATEGORIES] + [("notes", pa.string())])
+    with pq.ParquetWriter(f, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema=schema))
+
+# Stream a user's expenses into an open file object (text mode for csv/jsonl,
+# binary for parquet). Returns the number of records written.
+def export_expenses(username, fmt, f):
+    count = 0
+
+    def counted_rows():
+        nonlocal count
+        for row in iter_export_rows(username):
+            count += 1
+            yield row
+
+    if fmt == "csv":
+        write_csv(counted_rows(), f)
+    elif fmt == "jsonl":
+        write_jsonl(counted_rows(), f)
+    elif fmt == "parquet":
+        write_parquet(counted_rows(), f)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return count
+
+def export_to_path(username, fmt, path):
+    if fmt == "parquet":
+        with open(path, "wb") as f:
+            return export_expenses(username, fmt, f)
+    with open(path, "w", newline="") as f:
+        return export_expenses(username, fmt, f)
+
+# Export into a new temporary file on disk and return its path; the caller
+# removes it once done
+def export_to_temp_path(username, fmt):
+    f = tempfile.NamedTemporaryFile(prefix=f"{username}_export_", suffix=f".{fmt}", delete=False)
+    f.close()
+    try:
+        export_to_path(username, fmt, f.name)
+    except Exception:
+        os.remove(f.name)
+        raise
+    return f.name
@@ -0,0 +1,37 @@
+# Convert a numpy amount back to a plain int/float for display
+def as_amount(value):
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
+
+# Calculate potential savings
+def calculate_potential_savings(expenses, profile):
+    potential_savings = {}
+    savings_rates = {
+        "Groceries": 0.15 if profile["City_Tier"] == "Tier_1" else 0.12,
+        "Transport": 0.20 if profile["City_Tier"] == "Tier_1" else 0.15,
+        "Eating_Out": 0.25,
+        "Entertainment": 0.20,
+        "Utilities": 0.10,
+        "Healthcare": 0.05,
+        "Education": 0.08,
+        "Miscellaneous": 0.15
+    }
+    
+    for category, amount in expenses.items():
+        if category in savings_rates:
+            potential_savings[category] = round(amount * savings_rates[category], 2)
+    
+    return potential_savings
+
+# Budget used until the user saves their own goals
+def default_budget_goals(profile):
+    return {
+        "Groceries": profile['Income'] * 0.2,
+        "Transport": profile['Income'] * 0.1,
+        "Eating_Out": profile['Income'] * 0.1,
+        "Entertainment": profile['Income'] * 0.05,
+        "Utilities": profile['Income'] * 0.15,
+        "Healthcare": profile['Income'] * 0.05,
+        "Education": profile['Income'] * 0.1,
+        "Miscellaneous": profile['Income'] * 0.05
+    }
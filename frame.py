@@ -0,0 +1,229 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+import storage
+from storage import CATEGORIES
+from finance import as_amount
+from tracing import traced
+
+FRAME_COLUMNS = ["id", "year", "month", "timestamp", "date"] + CATEGORIES + ["notes"]
+
+
+# Flatten the stored year -> month -> id -> record tree into one row per expense,
+# with a float column per category so aggregations run vectorized. Rows are
+# ordered newest first (ties broken by id), so the latest N expenses are simply
+# the first N rows and "cursor" is a strictly decreasing key for paging.
+@traced("frame.build_expense_frame")
+def build_expense_frame(all_expenses):
+    ids, years, months, timestamps, notes = [], [], [], [], []
+    amounts = {category: [] for category in CATEGORIES}
+
+    for year_key, year_data in all_expenses.items():
+        for month_key, month_data in year_data.items():
+            for expense_id, expense_data in month_data.items():
+                ids.append(expense_id)
+                years.append(int(year_key))
+                months.append(int(month_key))
+                timestamps.append(expense_data.get('timestamp', f"{year_key}-{int(month_key):02d}-01 00:00:00"))
+                notes.append(expense_data.get('notes', ""))
+                for category in CATEGORIES:
+                    amount = expense_data.get(category, 0)
+                    amounts[category].append(amount if isinstance(amount, (int, float)) else 0)
+
+    frame = pd.DataFrame({
+        "id": pd.Series(ids, dtype=object),
+        "year": np.asarray(years, dtype=np.int32),
+        "month": np.asarray(months, dtype=np.int8),
+        "timestamp": pd.Series(timestamps, dtype=object),
+        "date": pd.to_datetime(pd.Series(timestamps, dtype=object), format="%Y-%m-%d %H:%M:%S", errors="coerce"),
+        **{category: np.asarray(amounts[category], dtype=np.float64) for category in CATEGORIES},
+        "notes": pd.Series(notes, dtype=object),
+    }, columns=FRAME_COLUMNS)
+    frame["total"] = frame[CATEGORIES].sum(axis=1)
+    frame["cursor"] = frame["timestamp"] + "|" + frame["id"]
+    return frame.sort_values("cursor", ascending=False).reset_index(drop=True)
+
+# Same frame as build_expense_frame from the structured record array of the
+# binary store (see binstore.py): amounts and periods are column slices of
+# the mapped records, only ids and timestamps are converted per row
+@traced("frame.frame_from_records")
+def frame_from_records(records, notes):
+    from binstore import NO_TIMESTAMP, id_strings, timestamp_strings
+    ids = pd.Series(id_strings(records["id"]), dtype=object)
+    years = records["year"].astype(np.int32)
+    months = records["month"].astype(np.int8)
+    epochs = records["timestamp"]
+    dates = pd.Series(pd.to_datetime(np.where(epochs == NO_TIMESTAMP, 0, epochs), unit="s"))
+    missing = epochs == NO_TIMESTAMP
+    if missing.any():
+        dates[missing] = pd.to_datetime({"year": years[missing], "month": months[missing], "day": 1}).to_numpy()
+    amounts = records["amounts"]
+
+    frame = pd.DataFrame({
+        "id": ids,
+        "year": years,
+        "month": months,
+        "timestamp": pd.Series(timestamp_strings(dates.to_numpy()), dtype=object),
+        "date": dates,
+        **{category: amounts[:, i] for i, category in enumerate(CATEGORIES)},
+        "notes": ids.map(notes).fillna("") if notes else pd.Series("", index=ids.index, dtype=object),
+    }, columns=FRAME_COLUMNS)
+    frame["total"] = amounts.sum(axis=1)
+    frame["cursor"] = frame["timestamp"] + "|" + frame["id"]
+    return frame.sort_values("cursor", ascending=False).reset_index(drop=True)
+
+# Expense frame for a user, cached alongside the parsed expense file
+@traced("frame.get_expense_frame")
+def get_expense_frame(username):
+    store = storage.get_store()
+    if hasattr(store, 'load_array'):
+        loader = lambda: frame_from_records(*store.load_array(username))
+    else:
+        loader = lambda: build_expense_frame(storage.get_all_user_expenses(username))
+    return storage.file_cache.get(('expenses', username), (storage.storage_backend, 'frame'),
+                                  store.signature_paths(username), loader)
+
+def month_rows(frame, year, month):
+    return frame[(frame["year"] == year) & (frame["month"] == month)]
+
+# Per-category sums for a slice of the frame, keyed by category name
+def category_totals(frame):
+    sums = frame[CATEGORIES].sum()
+    return {category: as_amount(sums[category]) for category in CATEGORIES}
+
+# Latest n expenses, newest first
+def recent_expenses(frame, n=5):
+    return frame.head(n)
+
+# Up to page_size rows older than the cursor of the last row already shown
+@traced("frame.page_after")
+def page_after(frame, cursor=None, page_size=20):
+    if cursor is None:
+        start = 0
+    else:
+        ascending = frame["cursor"].to_numpy()[::-1]
+        start = len(ascending) - int(np.searchsorted(ascending, cursor, side="left"))
+    return frame.iloc[start:start + page_size]
+
+def _label_months(monthly):
+    monthly["Total"] = monthly[CATEGORIES].sum(axis=1)
+    monthly["Month"] = [f"{calendar.month_abbr[m]} {y}" for y, m in zip(monthly["year"], monthly["month"])]
+    monthly["Sort_Key"] = monthly["year"] * 100 + monthly["month"]
+    return monthly
+
+# One row per (year, month) with category sums, a Total and a display label
+@traced("frame.monthly_category_totals")
+def monthly_category_totals(frame):
+    monthly = frame.groupby(["year", "month"], sort=True)[CATEGORIES].sum().reset_index()
+    return _label_months(monthly)
+
+# Same shape as monthly_category_totals, read from a precomputed rollup
+@traced("frame.rollup_monthly_totals")
+def rollup_monthly_totals(rollup):
+    rows = [[int(year), int(month)] + [month_stats.get(category, {}).get("sum", 0) for category in CATEGORIES]
+            for year, year_data in rollup.items()
+            for month, month_stats in year_data.items()]
+    monthly = pd.DataFrame(rows, columns=["year", "month"] + CATEGORIES)
+    monthly[CATEGORIES] = monthly[CATEGORIES].astype(np.float64)
+    monthly = monthly.sort_values(["year", "month"]).reset_index(drop=True)
+    return _label_months(monthly)
+
+RESOLUTIONS = ["month", "quarter", "year", "rolling"]
+
+def _period_label(period, resolution):
+    if resolution == "quarter":
+        return f"Q{period.quarter} {period.year}"
+    if resolution == "year":
+        return str(period.year)
+    return f"{calendar.month_abbr[period.month]} {period.year}"
+
+# Re-aggregate monthly category totals (as returned by monthly_category_totals
+# or rollup_monthly_totals) to a coarser resolution: quarter and year sum the
+# months they contain, rolling is the trailing window-month mean over every
+# calendar month, including months without expenses. Rows are ordered by
+# period, Month holds the display label and Sort_Key the period ordinal.
+# At most max_points rows are returned: a longer rolling series keeps every
+# k-th point ending at the latest month, other resolutions keep the latest
+# max_points periods.
+@traced("frame.period_totals")
+def period_totals(monthly, resolution="month", window=3, max_points=None):
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    values = monthly[CATEGORIES].set_index(
+        pd.PeriodIndex.from_fields(year=monthly["year"], month=monthly["month"], freq="M"))
+
+    if values.empty:
+        grouped = values
+    elif resolution in ("quarter", "year"):
+        grouped = values.groupby(values.index.asfreq("Q" if resolution == "quarter" else "Y")).sum()
+    elif resolution == "rolling":
+        months = pd.period_range(values.index.min(), values.index.max(), freq="M")
+        grouped = values.groupby(level=0).sum().reindex(months, fill_value=0).rolling(window, min_periods=1).mean()
+    else:
+        grouped = values.groupby(level=0).sum()
+    grouped = grouped.sort_index()
+
+    if max_points and len(grouped) > max_points:
+        if resolution == "rolling":
+            step = -(-len(grouped) // max_points)
+            grouped = grouped.iloc[(len(grouped) - 1) % step::step]
+        else:
+            grouped = grouped.iloc[-max_points:]
+
+    periods = grouped.reset_index(drop=True)
+    periods["Total"] = periods[CATEGORIES].sum(axis=1)
+    periods["Month"] = [_period_label(period, resolution) for period in grouped.index]
+    periods["Sort_Key"] = np.asarray([period.ordinal for period in grouped.index], dtype=np.int64)
+    return periods
+
+# Finest of month, quarter and year that fits in max_points periods
+def default_resolution(monthly, max_points):
+    if len(monthly) <= max_points:
+        return "month"
+    quarters = len(set(zip(monthly["year"], (monthly["month"] - 1) // 3)))
+    return "quarter" if quarters <= max_points else "year"
+
+# Expense frame for the months between start and end (see storage.query_expenses),
+# cached like get_expense_frame
+@traced("frame.get_range_frame")
+def get_range_frame(username, start=None, end=None, categories=None):
+    if start is None and end is None and not categories:
+        return get_expense_frame(username)
+    start, end = storage.month_period(start), storage.month_period(end)
+    categories = tuple(categories or ())
+    store = storage.get_store()
+    return storage.file_cache.get(('expenses', username), (storage.storage_backend, 'frame', start, end, categories),
+                                  store.signature_paths(username),
+                                  lambda: build_expense_frame(storage.query_expenses(username, start, end, categories)))
+
+# Same selection as get_range_frame applied to an existing frame
+@traced("frame.frame_between")
+def frame_between(frame, start=None, end=None, categories=None):
+    periods = frame["year"].astype(np.int64) * 100 + frame["month"]
+    mask = np.ones(len(frame), dtype=bool)
+    start, end = storage.month_period(start), storage.month_period(end)
+    if start is not None:
+        mask &= (periods >= start[0] * 100 + start[1]).to_numpy()
+    if end is not None:
+        mask &= (periods <= end[0] * 100 + end[1]).to_numpy()
+    if categories:
+        mask &= (frame[list(categories)] != 0).any(axis=1).to_numpy()
+    return frame[mask]
+
+DATE_RANGES = ["All time", "This month", "Last 3 months", "Last 12 months", "Year to date", "Custom"]
+
+# (start, end) dates for one of DATE_RANGES relative to today; None for an
+# open end. "Custom" is resolved by the caller.
+def date_range(name, today):
+    first_of_month = today.replace(day=1)
+    if name == "This month":
+        return first_of_month, today
+    if name in ("Last 3 months", "Last 12 months"):
+        months_back = 2 if name == "Last 3 months" else 11
+        index = today.year * 12 + today.month - 1 - months_back
+        return first_of_month.replace(year=index // 12, month=index % 12 + 1), today
+    if name == "Year to date":
+        return first_of_month.replace(month=1), today
+    return None, None
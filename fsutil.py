@@ -0,0 +1,72 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows; locks then only cover threads of this process
+    fcntl = None
+
+import config
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+_held = threading.local()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        lock = _thread_locks.get(path)
+        if lock is None:
+            lock = _thread_locks[path] = threading.Lock()
+        return lock
+
+# Exclusive lock on lock_path shared by threads and processes. Re-entrant
+# within a thread, so a locked function can call other locked functions.
+@contextmanager
+def file_lock(lock_path):
+    held = getattr(_held, 'counts', None)
+    if held is None:
+        held = _held.counts = {}
+    if held.get(lock_path):
+        held[lock_path] += 1
+        try:
+            yield
+        finally:
+            held[lock_path] -= 1
+        return
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with _thread_lock(lock_path):
+        with open(lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            held[lock_path] = 1
+            try:
+                yield
+            finally:
+                held[lock_path] = 0
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def sync(f):
+    f.flush()
+    if config.FSYNC_WRITES:
+        os.fsync(f.fileno())
+
+# Write JSON to a temporary file next to path and rename it into place, so
+# readers see either the old or the new contents, never a partial file
+def atomic_write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+            sync(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+import storage
+from storage import CATEGORIES
+from finance import as_amount
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+# Import summary returned by import_expenses
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+
+    def skip(self, message):
+        self.skipped += 1
+        # Keep the first few messages only; a bad export can have thousands
+        if len(self.errors) < 20:
+            self.errors.append(message)
+
+
+def detect_format(name):
+    extension = os.path.splitext(name)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    raise ValueError(f"Cannot tell the file format of {name}; use csv or parquet")
+
+# Read a CSV or Parquet source (path or file object) as a stream of DataFrames
+def read_chunks(source, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+# Column names of a source without reading all of it
+def preview(source, fmt, rows=5):
+    chunk = next(read_chunks(source, fmt, rows), None)
+    return chunk if chunk is not None else pd.DataFrame()
+
+def _normalize(name):
+    return str(name).strip().lower().replace(" ", "_").replace("-", "_")
+
+# Default wide-layout mapping: source columns whose names match a category
+def guess_mapping(columns):
+    by_name = {_normalize(category): category for category in CATEGORIES}
+    return {column: by_name[_normalize(column)] for column in columns if _normalize(column) in by_name}
+
+# Category for a long-layout category value: explicit mapping first, then a
+# category of the same name, then Miscellaneous
+def _category_for(value, mapping):
+    if value in mapping:
+        return mapping[value]
+    normalized = _normalize(value)
+    for category in CATEGORIES:
+        if _normalize(category) == normalized:
+            return category
+    return mapping.get(normalized, "Miscellaneous")
+
+# Numeric amounts of a column. With absolute (debit/credit exports) negative
+# amounts are spending and are negated, while positive ones are credits and
+# come out negative, so they are skipped like any other negative amount.
+def _amounts(values, absolute):
+    amounts = pd.to_numeric(values, errors="coerce")
+    return -amounts if absolute else amounts
+
+# Cells of a column that hold something, blank strings included as empty
+def _given(values):
+    given = values.notna()
+    if values.dtype == object:
+        given &= values.astype(str).str.strip() != ""
+    return given
+
+def _chunk_records(chunk, offset, result, date_column, mapping, category_column, amount_column,
+                   notes_column, absolute):
+    dates = pd.to_datetime(chunk[date_column], errors="coerce")
+    notes = chunk[notes_column].fillna("").astype(str) if notes_column else None
+
+    if category_column:
+        # Long layout: one category and one amount per row
+        amounts = _amounts(chunk[amount_column], absolute)
+        categories = chunk[category_column].map(lambda value: _category_for(value, mapping)).to_numpy()
+        valid = (dates.notna() & amounts.notna() & (amounts >= 0)).to_numpy()
+        credits = (amounts < 0).to_numpy() if absolute else None
+        amount_values = amounts.to_numpy()
+    else:
+        # Wide layout: one column per category. Blank cells count as 0, but a
+        # row needs at least one amount and none that fails to parse.
+        amount_frame = pd.DataFrame({category: 0.0 for category in CATEGORIES}, index=chunk.index)
+        given = pd.Series(False, index=chunk.index)
+        unparsed = pd.Series(False, index=chunk.index)
+        for column, category in mapping.items():
+            amounts = _amounts(chunk[column], absolute)
+            cells = _given(chunk[column])
+            given |= cells
+            unparsed |= cells & amounts.isna()
+            amount_frame[category] += amounts.fillna(0)
+        readable = given & ~unparsed
+        valid = (dates.notna() & readable & (amount_frame >= 0).all(axis=1)).to_numpy()
+        credits = (readable & (amount_frame < 0).any(axis=1)).to_numpy() if absolute else None
+        amount_values = amount_frame[CATEGORIES].to_numpy()
+
+    for position in (~valid).nonzero()[0]:
+        if credits is not None and credits[position]:
+            result.skip(f"Row {offset + position + 1}: credit (positive amount), not spending")
+        else:
+            result.skip(f"Row {offset + position + 1}: missing date or invalid amount")
+
+    years = dates.dt.year.to_numpy()
+    months = dates.dt.month.to_numpy()
+    timestamps = dates.dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy()
+    note_values = notes.to_numpy() if notes is not None else None
+
+    for position in valid.nonzero()[0]:
+        if category_column:
+            record = {category: 0 for category in CATEGORIES}
+            record[categories[position]] = as_amount(amount_values[position])
+        else:
+            record = {category: as_amount(amount) for category, amount in zip(CATEGORIES, amount_values[position])}
+        if note_values is not None:
+            record["notes"] = note_values[position]
+        record["timestamp"] = timestamps[position]
+        yield int(years[position]), int(months[position]), record
+
+# Stream expenses from a CSV/Parquet source into a user's store in one batch;
+# nothing is stored unless the whole source parses.
+# mapping maps source columns to categories (wide layout) or, when
+# category_column is given, source category values to categories (long layout).
+def import_expenses(username, source, fmt, date_column="date", mapping=None, category_column=None,
+                    amount_column="amount", notes_column=None, absolute=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    result = ImportResult()
+    mapping = dict(mapping or {})
+
+    def records():
+        offset = 0
+        for chunk in read_chunks(source, fmt, chunk_size):
+            required = [date_column] + ([category_column, amount_column] if category_column else list(mapping))
+            missing = [column for column in required if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing columns in import file: {', '.join(missing)}")
+            if not category_column and not mapping:
+                mapping.update(guess_mapping(chunk.columns))
+                if not mapping:
+                    raise ValueError("No columns could be mapped to expense categories")
+            yield from _chunk_records(chunk, offset, result, date_column, mapping, category_column,
+                                      amount_column, notes_column, absolute)
+            offset += len(chunk)
+
+    unknown = set(mapping.values()) - set(CATEGORIES)
+    if unknown:
+        raise ValueError(f"Unknown categories in mapping: {', '.join(sorted(unknown))}")
+
+    # Parse and validate the whole source before anything is written, so a bad
+    # chunk late in the file cannot leave part of the import stored. Valid
+    # rows are spooled to a temporary file rather than held in memory.
+    with tempfile.TemporaryFile("w+") as spool:
+        for row in records():
+            spool.write(json.dumps(row) + "\n")
+        spool.seek(0)
+        result.imported = storage.save_expense_batch(username, (json.loads(line) for line in spool))
+    return result
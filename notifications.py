@@ -0,0 +1,159 @@
+import bisect
+import heapq
+import os
+from datetime import datetime
+from itertools import islice
+
+import config
+import storage
+from fsutil import atomic_write_json
+
+NOTIFICATION_TYPES = ["info", "success", "warning", "error"]
+
+
+# Bounded notification history: the newest limit notifications, kept in id
+# (= arrival) order so the oldest is dropped first once the buffer is full.
+# Ids are indexed by (type, read) in ascending lists and unread counts per
+# type are kept up to date on every change, so filtering, paging and counting
+# touch only the matching entries. A notification may carry a dedup key; keys
+# of the buffered notifications are indexed too.
+class NotificationBuffer:
+    def __init__(self, limit=None, items=(), next_id=1):
+        self.limit = limit or config.NOTIFICATION_LIMIT
+        self.next_id = next_id
+        self._items = {}
+        self._index = {}
+        self._unread = {}
+        self._keys = {}
+        for item in items:
+            self._insert(item)
+            self.next_id = max(self.next_id, item["id"] + 1)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _insert(self, item):
+        self._items[item["id"]] = item
+        bisect.insort(self._index.setdefault((item["type"], item["read"]), []), item["id"])
+        if not item["read"]:
+            self._unread[item["type"]] = self._unread.get(item["type"], 0) + 1
+        if item.get("key"):
+            self._keys[item["key"]] = item["id"]
+        while len(self._items) > self.limit:
+            self._remove(next(iter(self._items)))
+
+    def _unindex(self, item):
+        ids = self._index[(item["type"], item["read"])]
+        del ids[bisect.bisect_left(ids, item["id"])]
+        if not item["read"]:
+            self._unread[item["type"]] -= 1
+
+    def _remove(self, notification_id):
+        item = self._items.pop(notification_id)
+        self._unindex(item)
+        if self._keys.get(item.get("key")) == notification_id:
+            del self._keys[item["key"]]
+
+    def has_key(self, key):
+        return key in self._keys
+
+    def add(self, message, type="info", timestamp=None, **extra):
+        item = {"id": self.next_id, "message": message, "type": type,
+                "timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "read": False, **extra}
+        self.next_id += 1
+        self._insert(item)
+        return item
+
+    # Add a notification unless one with the same key is still buffered;
+    # returns the new notification or None
+    def add_unique(self, key, message, type="info", **extra):
+        if key in self._keys:
+            return None
+        return self.add(message, type, key=key, **extra)
+
+    # Mark the given ids (default: every unread notification) as read; returns
+    # how many changed
+    def mark_read(self, ids=None):
+        if ids is None:
+            ids = [i for (_, read), index in self._index.items() if not read for i in index]
+        changed = 0
+        for notification_id in ids:
+            item = self._items.get(notification_id)
+            if item is None or item["read"]:
+                continue
+            self._unindex(item)
+            item["read"] = True
+            self._insert(item)
+            changed += 1
+        return changed
+
+    def unread_count(self, type=None):
+        if type is not None:
+            return self._unread.get(type, 0)
+        return sum(self._unread.values())
+
+    def _matching(self, type=None, read=None):
+        return [index for (item_type, item_read), index in self._index.items()
+                if (type is None or item_type == type) and (read is None or item_read == read) and index]
+
+    def count(self, type=None, read=None):
+        return sum(len(index) for index in self._matching(type, read))
+
+    # One page of the notifications matching type and read state, newest
+    # first, and the number of matches
+    def page(self, type=None, read=None, offset=0, limit=20):
+        indexes = self._matching(type, read)
+        total = sum(len(index) for index in indexes)
+        if len(indexes) == 1:
+            index = indexes[0]
+            ids = index[max(len(index) - offset - limit, 0):max(len(index) - offset, 0)][::-1]
+        else:
+            ids = islice(heapq.merge(*(reversed(index) for index in indexes), reverse=True), offset, offset + limit)
+        return [self._items[i] for i in ids], total
+
+    def to_json(self):
+        return {"next_id": self.next_id, "items": list(self._items.values())}
+
+    @classmethod
+    def from_json(cls, data, limit=None):
+        data = data or {}
+        return cls(limit, data.get("items", []), data.get("next_id", 1))
+
+
+def notifications_path(username):
+    return os.path.join(storage.base_dir, f'{username}_notifications.json')
+
+def _read_buffer(username):
+    return NotificationBuffer.from_json(storage.read_json(notifications_path(username), None))
+
+# A user's notifications, shared by every session; treat as read-only and
+# change it through add_notification() and mark_read()
+def load_notifications(username):
+    path = notifications_path(username)
+    return storage.file_cache.get(('notifications', username), path, [path], lambda: _read_buffer(username))
+
+# Apply change to a fresh copy of the user's buffer under the user's lock and
+# write it back, so concurrent sessions and processes never lose an update
+def _update(username, change):
+    path = notifications_path(username)
+    with storage.user_lock(username):
+        buffer = _read_buffer(username)
+        result = change(buffer)
+        atomic_write_json(path, buffer.to_json())
+        storage.file_cache.invalidate(('notifications', username))
+        storage.file_cache.get(('notifications', username), path, [path], lambda: buffer)
+    return result
+
+def add_notification(username, message, type="info", **extra):
+    return _update(username, lambda buffer: buffer.add(message, type, **extra))
+
+# Add (key, message, type) entries for one user in a single write, skipping
+# keys already present; returns the notifications added
+def add_unique_notifications(username, entries):
+    def change(buffer):
+        added = (buffer.add_unique(key, message, type) for key, message, type in entries)
+        return [item for item in added if item is not None]
+    return _update(username, change)
+
+def mark_read(username, ids=None):
+    return _update(username, lambda buffer: buffer.mark_read(ids))
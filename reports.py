@@ -0,0 +1,101 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import storage
+from storage import CATEGORIES
+from finance import calculate_potential_savings, as_amount
+from budgets import evaluate_budgets, category_vector, user_budget_goals, ALERT_NEAR_LIMIT, ALERT_OVERSPENT
+
+REPORT_COLUMNS = (["user", "year", "month", "total", "income", "savings", "savings_rate", "target_savings_rate",
+                   "meets_target", "near_limit_categories", "overspent_categories", "potential_savings"]
+                  + [f"potential_{category}" for category in CATEGORIES])
+
+
+# Report rows for one user: one per month with expenses, oldest first, with
+# the month's spending, savings rate against the profile's target, budget
+# alert counts and calculate_potential_savings for the month's categories.
+# Months can be limited to a single (year, month) period.
+def user_report(username, period=None):
+    profile = storage.load_user_profile(username)
+    if not profile:
+        return []
+    rollup = storage.load_rollup(username)
+    periods = sorted((int(year), int(month)) for year, year_data in rollup.items() for month in year_data)
+    if period is not None:
+        periods = [p for p in periods if p == tuple(period)]
+    if not periods:
+        return []
+
+    income = profile.get("Income", 0)
+    target = profile.get("Desired_Savings_Percentage", 0)
+    monthly = [storage.rollup_category_totals(rollup, year, month) for year, month in periods]
+    evaluation = evaluate_budgets([category_vector(totals) for totals in monthly],
+                                  category_vector(user_budget_goals(username, profile)))
+    near_limit = (evaluation["level"] == ALERT_NEAR_LIMIT).sum(axis=1)
+    overspent = (evaluation["level"] == ALERT_OVERSPENT).sum(axis=1)
+
+    rows = []
+    for i, ((year, month), totals) in enumerate(zip(periods, monthly)):
+        total = as_amount(sum(totals.values()))
+        savings = as_amount(income - total)
+        savings_rate = round(savings / income * 100, 2) if income > 0 else 0
+        potential = calculate_potential_savings(totals, profile)
+        rows.append({
+            "user": username,
+            "year": year,
+            "month": month,
+            "total": total,
+            "income": income,
+            "savings": savings,
+            "savings_rate": savings_rate,
+            "target_savings_rate": target,
+            "meets_target": savings_rate >= target,
+            "near_limit_categories": int(near_limit[i]),
+            "overspent_categories": int(overspent[i]),
+            "potential_savings": as_amount(sum(potential.values())),
+            **{f"potential_{category}": potential.get(category, 0) for category in CATEGORIES},
+        })
+    return rows
+
+def _configure_worker(data_dir, backend, db_path):
+    storage.configure(data_dir=data_dir, backend=backend, db_path=db_path)
+
+# Report rows for every user, in the order given. With more than one worker
+# the users are spread over a process pool (each worker configured like this
+# process) in chunks, so thousands of users keep every core busy.
+def iter_report(usernames, period=None, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(usernames) < 2:
+        for username in usernames:
+            yield from user_report(username, period)
+        return
+
+    chunksize = max(1, len(usernames) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_configure_worker,
+                             initargs=(storage.base_dir, storage.storage_backend, storage.sqlite_path)) as pool:
+        for rows in pool.map(user_report, usernames, [period] * len(usernames), chunksize=chunksize):
+            yield from rows
+
+def write_report(rows, fmt, f):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    return count
+
+# Write the consolidated report for all profiles (or the given users) to path
+def generate_report(path, fmt="csv", usernames=None, period=None, workers=None):
+    usernames = usernames or storage.profile_usernames()
+    with open(path, "w", newline="") as f:
+        return write_report(iter_report(usernames, period, workers), fmt, f)
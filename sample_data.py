@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import numpy as np
+
+from storage import CATEGORIES
+from binstore import RECORD_DTYPE, decode_records
+
+# Records generated per step while streaming rows
+CHUNK = 10000
+
+
+# Synthetic records as one structured array in the binary store layout
+# (binstore.RECORD_DTYPE), one per entry of month_offsets (months before end).
+# Amounts are 500-5000 per category with +/-20% variation, timestamps fall in
+# the first 28 days of the record's month but never after end, and ids are
+# random version-4 UUIDs.
+def _generate(rng, month_offsets, end):
+    count = len(month_offsets)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+
+    ids = np.frombuffer(rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    ids[:, 6] = ids[:, 6] & 0x0f | 0x40
+    ids[:, 8] = ids[:, 8] & 0x3f | 0x80
+    records["id"] = ids.view("V16").ravel()
+
+    index = end.year * 12 + end.month - 1 - np.asarray(month_offsets, dtype=np.int64)
+    records["year"] = index // 12
+    records["month"] = index % 12 + 1
+    month_starts = (index - 1970 * 12).astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+    # Records of end's own month are spread over the part of it up to end
+    latest = np.datetime64(end.replace(microsecond=0), "s").astype(np.int64)
+    spans = np.minimum(28 * 86400, latest + 1 - month_starts)
+    records["timestamp"] = month_starts + (rng.random(count) * spans).astype(np.int64)
+
+    records["amounts"] = np.round(rng.integers(500, 5000, size=(count, len(CATEGORIES))) *
+                                  rng.uniform(0.8, 1.2, size=(count, len(CATEGORIES))))
+    return records
+
+# Synthetic expense history for load testing: records records spread evenly
+# over the months before end (default: now), generated in one shot as a
+# structured array that storage.save_expense_array writes straight to the
+# store. A seed makes the output repeatable.
+def generate_records(records, months=24, seed=None, end=None):
+    rng = np.random.default_rng(seed)
+    return _generate(rng, np.arange(records, dtype=np.int64) * months // records, end or datetime.now())
+
+# The same history streamed as (year, month, record, id) rows, in the shape
+# save_expense_batch takes, CHUNK records at a time
+def generate_history(records, months=24, seed=None, end=None):
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now()
+    for start in range(0, records, CHUNK):
+        offsets = np.arange(start, min(start + CHUNK, records), dtype=np.int64) * months // records
+        for year, month, expense_id, record in decode_records(_generate(rng, offsets, end)):
+            yield int(year), int(month), record, expense_id
+
+# Demo data for users without expenses: 3 to 5 records in each of the last
+# months months
+def sample_records(months=6, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    return _generate(rng, np.repeat(np.arange(months), rng.integers(3, 6, size=months)), end or datetime.now())
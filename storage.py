@@ -0,0 +1,801 @@
+import os
+import json
+import heapq
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+import config
+from cache import FileCache
+from fsutil import file_lock, atomic_write_json, sync
+from tracing import traced
+
+CATEGORIES = ["Groceries", "Transport", "Eating_Out", "Entertainment",
+              "Utilities", "Healthcare", "Education", "Miscellaneous"]
+
+
+# Raised when a file that must be rewritten cannot be parsed, so that it is
+# left alone instead of being overwritten with partial data
+class CorruptDataError(Exception):
+    pass
+
+# Active storage settings (see configure())
+base_dir = config.BASE_DIR
+storage_backend = config.STORAGE_BACKEND
+sqlite_path = config.SQLITE_PATH
+
+_store = None
+
+# Parsed profile, budget and expense data shared across sessions
+file_cache = FileCache(config.CACHE_MAX_ENTRIES, config.CACHE_MAX_BYTES)
+
+
+# Expense storage in JSON files sharded per user and year. {username}_expenses/
+# holds, for each year, a {year}.json snapshot and a {year}.jsonl journal of
+# newer records. Saving appends to the journal of the record's year; once that
+# journal grows past compact_bytes it is folded into the year's snapshot, so a
+# write never touches other years and reading a month opens one year's files.
+# Users still in the old single-file layout ({username}_expenses.json plus
+# {username}_expenses.jsonl) are moved into shards on first access.
+class JsonExpenseStore:
+    def __init__(self, data_dir, compact_bytes=config.JOURNAL_COMPACT_BYTES):
+        self.data_dir = data_dir
+        self.compact_bytes = compact_bytes
+
+    def user_dir(self, username):
+        return os.path.join(self.data_dir, f'{username}_expenses')
+
+    def snapshot_path(self, username, year):
+        return os.path.join(self.user_dir(username), f'{year}.json')
+
+    def journal_path(self, username, year):
+        return os.path.join(self.user_dir(username), f'{year}.jsonl')
+
+    def legacy_paths(self, username):
+        return [os.path.join(self.data_dir, f'{username}_expenses.json'),
+                os.path.join(self.data_dir, f'{username}_expenses.jsonl')]
+
+    def _lock(self, username):
+        return file_lock(os.path.join(self.data_dir, '.locks', f'{username}.lock'))
+
+    def _shard_years(self, username):
+        try:
+            names = os.listdir(self.user_dir(username))
+        except FileNotFoundError:
+            return []
+        return sorted({name.split('.')[0] for name in names
+                       if name.endswith(('.json', '.jsonl')) and name.split('.')[0].isdigit()}, key=int)
+
+    # Years with a shard, oldest first
+    def years(self, username):
+        self._migrate(username)
+        return self._shard_years(username)
+
+    # Apply journal lines to a tree; year=None reads the legacy journal, whose
+    # lines carry their year, otherwise lines are months of that year
+    @staticmethod
+    def _replay(tree, journal_path, year=None):
+        if not os.path.exists(journal_path):
+            return tree
+        with open(journal_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append; skip it
+                    continue
+                months = tree.setdefault(entry['year'], {}) if year is None else tree
+                months.setdefault(entry['month'], {})[entry['id']] = entry['data']
+        return tree
+
+    def _read_year(self, username, year, strict=False):
+        year_data = read_json(self.snapshot_path(username, year), {}, strict)
+        return self._replay(year_data, self.journal_path(username, year), year)
+
+    # Move a legacy single-file user into year shards. Records already in a
+    # shard win over legacy ones with the same id; a legacy snapshot that
+    # cannot be parsed is kept as .corrupt for repair instead of being dropped.
+    def _migrate(self, username):
+        legacy_snapshot, legacy_journal = self.legacy_paths(username)
+        if not (os.path.exists(legacy_snapshot) or os.path.exists(legacy_journal)):
+            return
+        with self._lock(username):
+            if not (os.path.exists(legacy_snapshot) or os.path.exists(legacy_journal)):
+                return
+            try:
+                tree = read_json(legacy_snapshot, {}, strict=True)
+                corrupt = False
+            except CorruptDataError:
+                tree, corrupt = {}, True
+            self._replay(tree, legacy_journal)
+
+            os.makedirs(self.user_dir(username), exist_ok=True)
+            for year, year_data in tree.items():
+                for month, month_data in self._read_year(username, year, strict=True).items():
+                    year_data.setdefault(month, {}).update(month_data)
+                atomic_write_json(self.snapshot_path(username, year), year_data)
+                if os.path.exists(self.journal_path(username, year)):
+                    open(self.journal_path(username, year), 'w').close()
+
+            if os.path.exists(legacy_journal):
+                os.remove(legacy_journal)
+            if corrupt:
+                os.replace(legacy_snapshot, legacy_snapshot + '.corrupt')
+            elif os.path.exists(legacy_snapshot):
+                os.remove(legacy_snapshot)
+
+    # Files whose changes invalidate cached data for the user, or for one year
+    def signature_paths(self, username, year=None):
+        paths = self.legacy_paths(username)
+        if year is not None:
+            return paths + [self.snapshot_path(username, year), self.journal_path(username, year)]
+        paths.append(self.user_dir(username))
+        for shard_year in self._shard_years(username):
+            paths += [self.snapshot_path(username, shard_year), self.journal_path(username, shard_year)]
+        return paths
+
+    def load_year(self, username, year):
+        self._migrate(username)
+        return self._read_year(username, str(year))
+
+    def load_tree(self, username):
+        all_expenses = {}
+        for year in self.years(username):
+            year_data = self._read_year(username, year)
+            if year_data:
+                all_expenses[year] = year_data
+        return all_expenses
+
+    def load_month(self, username, year, month):
+        return self.load_year(username, year).get(str(month), {})
+
+    # Same as SqliteExpenseStore.load_range, reading only the years in range
+    def load_range(self, username, start=None, end=None):
+        all_expenses = {}
+        for year in self.years(username):
+            if (start is not None and int(year) < start[0]) or (end is not None and int(year) > end[0]):
+                continue
+            for month, month_data in self._read_year(username, year).items():
+                period = (int(year), int(month))
+                if (start is None or period >= start) and (end is None or period <= end):
+                    all_expenses.setdefault(year, {})[month] = month_data
+        return all_expenses
+
+    # Yield (year, month, id, record) for every expense, one year in memory at a time
+    def iter_records(self, username):
+        for year in self.years(username):
+            for month, month_data in self._read_year(username, year).items():
+                for expense_id, record in month_data.items():
+                    yield year, month, expense_id, record
+
+    def save(self, username, year, month, expense_id, record):
+        self.save_many([(username, year, month, expense_id, record)])
+
+    def _open_journal(self, path):
+        f = open(path, 'a+b')
+        # Terminate a line torn by an interrupted append so the next entry
+        # does not get glued onto it
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        return f
+
+    # Callers hold the user's lock (see user_lock())
+    def save_many(self, rows):
+        handles = {}
+        try:
+            for username, year, month, expense_id, record in rows:
+                shard = (username, str(year))
+                if shard not in handles:
+                    self._migrate(username)
+                    os.makedirs(self.user_dir(username), exist_ok=True)
+                    handles[shard] = self._open_journal(self.journal_path(*shard))
+                entry = {"month": str(month), "id": expense_id, "data": record}
+                handles[shard].write((json.dumps(entry) + "\n").encode())
+            for f in handles.values():
+                sync(f)
+        finally:
+            for f in handles.values():
+                f.close()
+
+        for username, year in handles:
+            if os.path.getsize(self.journal_path(username, year)) >= self.compact_bytes:
+                try:
+                    self.compact_year(username, year)
+                except CorruptDataError:
+                    # Keep appending to the journal; the snapshot needs repair first
+                    pass
+
+    # Fold a year's journal into its snapshot
+    def compact_year(self, username, year):
+        year_data = self._read_year(username, year, strict=True)
+        atomic_write_json(self.snapshot_path(username, year), year_data)
+        # Replaying a journal entry twice is harmless (records are keyed by id),
+        # so a crash between the replace above and this truncate loses nothing.
+        open(self.journal_path(username, year), 'w').close()
+
+    def compact(self, username):
+        for year in self.years(username):
+            journal_path = self.journal_path(username, year)
+            if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+                self.compact_year(username, year)
+
+    def usernames(self):
+        names = set()
+        for f in os.listdir(self.data_dir):
+            for suffix in ('_expenses', '_expenses.json', '_expenses.jsonl'):
+                if f.endswith(suffix):
+                    names.add(f[:-len(suffix)])
+        return sorted(names)
+
+
+# Expense storage in a local SQLite file, one row per expense record with the
+# category amounts as columns and an index on (username, year, month).
+class SqliteExpenseStore:
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        category_columns = ", ".join(f"{category} NUMERIC NOT NULL DEFAULT 0" for category in CATEGORIES)
+        conn = self._connect()
+        with conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS expenses (
+                    id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    timestamp TEXT,
+                    notes TEXT,
+                    {category_columns}
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_period ON expenses (username, year, month)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_timestamp ON expenses (username, timestamp)")
+
+    def _row_values(self, username, year, month, expense_id, record):
+        amounts = [record.get(category, 0) or 0 for category in CATEGORIES]
+        return [expense_id, username, int(year), int(month), record.get('timestamp'), record.get('notes')] + amounts
+
+    def _record_from_row(self, row):
+        timestamp, notes = row[0], row[1]
+        record = dict(zip(CATEGORIES, row[2:]))
+        if notes is not None:
+            record['notes'] = notes
+        if timestamp is not None:
+            record['timestamp'] = timestamp
+        return record
+
+    def save(self, username, year, month, expense_id, record):
+        self.save_many([(username, year, month, expense_id, record)])
+
+    def save_many(self, rows):
+        placeholders = ", ".join("?" * (6 + len(CATEGORIES)))
+        columns = ", ".join(["id", "username", "year", "month", "timestamp", "notes"] + CATEGORIES)
+        conn = self._connect()
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO expenses ({columns}) VALUES ({placeholders})",
+                             (self._row_values(*row) for row in rows))
+
+    def _select_columns(self):
+        return ", ".join(["timestamp", "notes"] + CATEGORIES)
+
+    def signature_paths(self, username, year=None):
+        return [self.db_path, self.db_path + '-wal']
+
+    def load_tree(self, username):
+        all_expenses = {}
+        for year, month, expense_id, record in self.iter_records(username):
+            all_expenses.setdefault(year, {}).setdefault(month, {})[expense_id] = record
+        return all_expenses
+
+    # Yield (year, month, id, record) for every expense straight off the cursor
+    def iter_records(self, username):
+        cursor = self._connect().execute(
+            f"SELECT year, month, id, {self._select_columns()} FROM expenses WHERE username = ? ORDER BY year, month, rowid",
+            (username,))
+        for row in cursor:
+            yield str(row[0]), str(row[1]), row[2], self._record_from_row(row[3:])
+
+    def load_month(self, username, year, month):
+        cursor = self._connect().execute(
+            f"SELECT id, {self._select_columns()} FROM expenses WHERE username = ? AND year = ? AND month = ? ORDER BY rowid",
+            (username, int(year), int(month)))
+        return {row[0]: self._record_from_row(row[1:]) for row in cursor}
+
+    # Nested year -> month -> id tree for the periods between start and end,
+    # (year, month) tuples or None for open ends, using idx_expenses_period
+    def load_range(self, username, start=None, end=None):
+        conditions, params = ["username = ?"], [username]
+        if start is not None:
+            conditions.append("(year, month) >= (?, ?)")
+            params += [int(start[0]), int(start[1])]
+        if end is not None:
+            conditions.append("(year, month) <= (?, ?)")
+            params += [int(end[0]), int(end[1])]
+        cursor = self._connect().execute(
+            f"SELECT year, month, id, {self._select_columns()} FROM expenses WHERE {' AND '.join(conditions)} ORDER BY year, month, rowid",
+            params)
+        all_expenses = {}
+        for row in cursor:
+            all_expenses.setdefault(str(row[0]), {}).setdefault(str(row[1]), {})[row[2]] = self._record_from_row(row[3:])
+        return all_expenses
+
+    def usernames(self):
+        return [row[0] for row in self._connect().execute("SELECT DISTINCT username FROM expenses ORDER BY username")]
+
+
+# Point storage at a different data directory or backend
+def configure(data_dir=None, backend=None, db_path=None):
+    global base_dir, storage_backend, sqlite_path, _store
+    if data_dir is not None:
+        base_dir = data_dir
+        if db_path is None:
+            db_path = os.path.join(data_dir, "smartspend.db")
+    if backend is not None:
+        storage_backend = backend
+    if db_path is not None:
+        sqlite_path = db_path
+    _store = None
+    file_cache.clear()
+
+def make_store(backend):
+    if backend == "sqlite":
+        return SqliteExpenseStore(sqlite_path)
+    if backend == "json":
+        return JsonExpenseStore(base_dir)
+    if backend == "binary":
+        # NumPy is only needed for this backend
+        from binstore import BinaryExpenseStore
+        return BinaryExpenseStore(base_dir)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+def get_store():
+    global _store
+    if _store is None:
+        if not os.path.exists(base_dir):
+            os.makedirs(base_dir)
+        _store = make_store(storage_backend)
+    return _store
+
+# Parsed JSON file, or default when it is missing; an unparseable file is
+# also read as default unless strict, which raises CorruptDataError instead
+def read_json(path, default, strict=False):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        if strict:
+            raise CorruptDataError(f"Cannot parse {path}")
+        return default
+
+def _cached_json(group, path, default):
+    return file_cache.get(group, path, [path], lambda: read_json(path, default))
+
+# Lock serializing every write to one user's files, across sessions and processes
+def user_lock(username):
+    return file_lock(os.path.join(base_dir, '.locks', f'{username}.lock'))
+
+# Function to load/save user profile
+@traced("storage.save_user_profile")
+def save_user_profile(profile, username):
+    profile_path = os.path.join(base_dir, f'{username}_profile.json')
+    with user_lock(username):
+        atomic_write_json(profile_path, profile)
+    file_cache.invalidate(('profile', username))
+    _register_user(username, profile)
+
+@traced("storage.load_user_profile")
+def load_user_profile(username):
+    profile_path = os.path.join(base_dir, f'{username}_profile.json')
+    return _cached_json(('profile', username), profile_path, None)
+
+# User registry: users.json maps every username with a saved profile to the
+# fields shown when picking a profile, so finding users never has to list
+# base_dir. save_user_profile keeps it current; a missing registry is rebuilt
+# from the profile files once.
+def registry_path():
+    return os.path.join(base_dir, 'users.json')
+
+def _registry_entry(profile):
+    return {"name": profile.get("Name", "") if isinstance(profile, dict) else ""}
+
+def rebuild_user_registry():
+    with file_lock(os.path.join(base_dir, '.locks', 'users.lock')):
+        registry = {}
+        if os.path.exists(base_dir):
+            for f in os.listdir(base_dir):
+                if f.endswith('_profile.json'):
+                    username = f[:-len('_profile.json')]
+                    registry[username] = _registry_entry(read_json(os.path.join(base_dir, f), {}))
+        os.makedirs(base_dir, exist_ok=True)
+        atomic_write_json(registry_path(), registry)
+    file_cache.invalidate(('registry',))
+    return registry
+
+def _register_user(username, profile):
+    with file_lock(os.path.join(base_dir, '.locks', 'users.lock')):
+        registry = read_json(registry_path(), None)
+        if registry is None:
+            registry = rebuild_user_registry()
+        registry[username] = _registry_entry(profile)
+        atomic_write_json(registry_path(), registry)
+    file_cache.invalidate(('registry',))
+
+@traced("storage.load_user_registry")
+def load_user_registry():
+    registry = _cached_json(('registry',), registry_path(), None)
+    if registry is None:
+        registry = rebuild_user_registry()
+    return registry
+
+# Users with a saved profile, sorted
+def profile_usernames():
+    path = registry_path()
+    return file_cache.get(('registry',), 'sorted', [path], lambda: sorted(load_user_registry()))
+
+# One page of the users whose username or profile name contains query
+# (case-insensitive), with the total number of matches
+def search_users(query="", offset=0, limit=50):
+    usernames = profile_usernames()
+    query = query.strip().lower()
+    if query:
+        registry = load_user_registry()
+        usernames = [username for username in usernames
+                     if query in username.lower() or query in registry.get(username, {}).get("name", "").lower()]
+    return usernames[offset:offset + limit], len(usernames)
+
+# Function to save expenses
+@traced("storage.save_expenses")
+def save_expenses(expenses, username, month=None, year=None):
+    if not month:
+        month = datetime.now().month
+    if not year:
+        year = datetime.now().year
+
+    expenses['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    expense_id = str(uuid.uuid4())
+    with user_lock(username):
+        get_store().save(username, year, month, expense_id, expenses)
+        file_cache.invalidate(('expenses', username))
+        update_rollup(username, [(year, month, expenses)])
+        update_recent_index(username, [(year, month, expense_id, expenses)])
+
+    return expense_id
+
+# Function to load expenses
+@traced("storage.load_expenses")
+def load_expenses(username, month=None, year=None):
+    if not month and not year:
+        return get_all_user_expenses(username)
+
+    store = get_store()
+    return file_cache.get(('expenses', username), (storage_backend, str(year), str(month)),
+                          store.signature_paths(username, year),
+                          lambda: store.load_month(username, year, month))
+
+# Function to load all expenses for a user
+@traced("storage.get_all_user_expenses")
+def get_all_user_expenses(username):
+    store = get_store()
+    return file_cache.get(('expenses', username), (storage_backend, 'all'),
+                          store.signature_paths(username),
+                          lambda: store.load_tree(username))
+
+# (year, month) of a date, datetime, "YYYY-MM[-DD]" string or (year, month) tuple
+def month_period(value):
+    if value is None or isinstance(value, tuple):
+        return value
+    if isinstance(value, str):
+        value = datetime.strptime(value[:7], "%Y-%m")
+    return (value.year, value.month)
+
+# Restrict a year -> month -> id tree to records with a non-zero amount in one
+# of the given categories
+def _with_categories(all_expenses, categories):
+    filtered = {}
+    for year, year_data in all_expenses.items():
+        for month, month_data in year_data.items():
+            matches = {expense_id: record for expense_id, record in month_data.items()
+                       if any(record.get(category) for category in categories)}
+            if matches:
+                filtered.setdefault(year, {})[month] = matches
+    return filtered
+
+# Function to load the expenses filed between two months. start and end are
+# dates, datetimes or "YYYY-MM[-DD]" strings, inclusive and compared by month
+# (expenses are filed per month); None leaves that end open. Returns the same
+# year -> month -> id tree as load_expenses, limited to records spending in
+# one of categories when given. The JSON backend reads only the year shards
+# in range, the SQLite backend runs a range scan on its period index.
+@traced("storage.query_expenses")
+def query_expenses(username, start=None, end=None, categories=None):
+    start, end = month_period(start), month_period(end)
+    store = get_store()
+    matches = file_cache.get(('expenses', username), (storage_backend, 'range', start, end),
+                             store.signature_paths(username),
+                             lambda: store.load_range(username, start, end))
+    if categories:
+        matches = _with_categories(matches, categories)
+    return matches
+
+# Function to stream a user's expenses as (year, month, id, record) without
+# building the nested tree
+def iter_expense_records(username):
+    return get_store().iter_records(username)
+
+# Function to fold a user's expense journal into its snapshot (JSON backend only)
+def compact_expenses(username):
+    store = get_store()
+    if isinstance(store, JsonExpenseStore):
+        with user_lock(username):
+            store.compact(username)
+
+# Function to save budget goals
+@traced("storage.save_budget_goals")
+def save_budget_goals(username, budget_goals):
+    budget_path = os.path.join(base_dir, f'{username}_budget.json')
+    with user_lock(username):
+        atomic_write_json(budget_path, budget_goals)
+    file_cache.invalidate(('budget', username))
+
+# Function to load budget goals
+@traced("storage.load_budget_goals")
+def load_budget_goals(username):
+    budget_path = os.path.join(base_dir, f'{username}_budget.json')
+    return _cached_json(('budget', username), budget_path, {})
+
+# Monthly rollups: per user, per year/month, per category sum/count/min/max,
+# stored in {username}_rollup.json with the same year -> month nesting as the
+# expense tree and updated on every save.
+def rollup_path(username):
+    return os.path.join(base_dir, f'{username}_rollup.json')
+
+def add_to_rollup(rollup, year, month, record):
+    month_stats = rollup.setdefault(str(year), {}).setdefault(str(month), {})
+    for category in CATEGORIES:
+        amount = record.get(category)
+        if not isinstance(amount, (int, float)):
+            continue
+        stats = month_stats.get(category)
+        if stats is None:
+            month_stats[category] = {"sum": amount, "count": 1, "min": amount, "max": amount}
+        else:
+            stats["sum"] += amount
+            stats["count"] += 1
+            stats["min"] = min(stats["min"], amount)
+            stats["max"] = max(stats["max"], amount)
+    return rollup
+
+# Fold another rollup (e.g. of a batch of new records) into rollup
+def merge_rollup(rollup, other):
+    for year, year_data in other.items():
+        for month, month_stats in year_data.items():
+            target = rollup.setdefault(year, {}).setdefault(month, {})
+            for category, stats in month_stats.items():
+                current = target.get(category)
+                if current is None:
+                    target[category] = dict(stats)
+                else:
+                    current["sum"] += stats["sum"]
+                    current["count"] += stats["count"]
+                    current["min"] = min(current["min"], stats["min"])
+                    current["max"] = max(current["max"], stats["max"])
+    return rollup
+
+def build_rollup(all_expenses):
+    rollup = {}
+    for year, year_data in all_expenses.items():
+        for month, month_data in year_data.items():
+            for expense_data in month_data.values():
+                add_to_rollup(rollup, year, month, expense_data)
+    return rollup
+
+def _write_rollup(username, rollup):
+    atomic_write_json(rollup_path(username), rollup)
+    file_cache.invalidate(('rollup', username))
+
+def rebuild_rollup(username):
+    with user_lock(username):
+        rollup = build_rollup(get_store().load_tree(username))
+        if rollup or os.path.exists(rollup_path(username)):
+            _write_rollup(username, rollup)
+    return rollup
+
+# Fold newly saved (year, month, record) entries into the user's rollup.
+# Callers hold the user's lock.
+def update_rollup(username, entries):
+    if not os.path.exists(rollup_path(username)):
+        rebuild_rollup(username)
+        return
+    rollup = read_json(rollup_path(username), None)
+    if rollup is None:
+        rebuild_rollup(username)
+        return
+    for year, month, record in entries:
+        add_to_rollup(rollup, year, month, record)
+    _write_rollup(username, rollup)
+
+@traced("storage.load_rollup")
+def load_rollup(username):
+    rollup = _cached_json(('rollup', username), rollup_path(username), None)
+    if rollup is None:
+        rollup = rebuild_rollup(username)
+    return rollup
+
+# Category sums for one month of a rollup
+def rollup_category_totals(rollup, year, month):
+    month_stats = rollup.get(str(year), {}).get(str(month), {})
+    return {category: month_stats.get(category, {}).get("sum", 0) for category in CATEGORIES}
+
+# Recent-expense index: the newest RECENT_INDEX_SIZE records of a user, newest
+# first, kept in {username}_recent.json so the latest N can be served without
+# loading the whole history.
+def recent_index_path(username):
+    return os.path.join(base_dir, f'{username}_recent.json')
+
+def _recent_entry(year, month, expense_id, record):
+    return {"year": str(year), "month": str(month), "id": expense_id,
+            "timestamp": record.get('timestamp', f"{year}-{int(month):02d}-01 00:00:00"), "record": record}
+
+def _newest(entries, n):
+    return heapq.nlargest(n, entries, key=lambda entry: entry["timestamp"])
+
+def _write_recent_index(username, recent):
+    atomic_write_json(recent_index_path(username), recent)
+    file_cache.invalidate(('recent', username))
+
+def rebuild_recent_index(username):
+    with user_lock(username):
+        recent = _newest((_recent_entry(year, month, expense_id, record)
+                          for year, month, expense_id, record in get_store().iter_records(username)),
+                         config.RECENT_INDEX_SIZE)
+        if recent or os.path.exists(recent_index_path(username)):
+            _write_recent_index(username, recent)
+    return recent
+
+# Merge newly saved (year, month, id, record) entries into the recent index.
+# Callers hold the user's lock.
+def update_recent_index(username, entries):
+    recent = read_json(recent_index_path(username), None)
+    if recent is None:
+        rebuild_recent_index(username)
+        return
+    new_entries = [_recent_entry(*entry) for entry in entries]
+    _write_recent_index(username, _newest(new_entries + recent, config.RECENT_INDEX_SIZE))
+
+# Latest n expenses of a user as index entries (year, month, id, timestamp, record)
+@traced("storage.load_recent_expenses")
+def load_recent_expenses(username, n=5):
+    recent = _cached_json(('recent', username), recent_index_path(username), None)
+    if recent is None:
+        recent = rebuild_recent_index(username)
+    if n <= config.RECENT_INDEX_SIZE:
+        return recent[:n]
+    all_expenses = get_all_user_expenses(username)
+    return _newest((_recent_entry(year, month, expense_id, record)
+                    for year, year_data in all_expenses.items()
+                    for month, month_data in year_data.items()
+                    for expense_id, record in month_data.items()), n)
+
+# Save a stream of (year, month, record) rows for one user in one batch; a row
+# may carry a fourth item with a pre-assigned expense id. Rows are passed
+# straight through to the store, while the rollup and the recent index are
+# updated in memory and written once at the end. Only SQLite writes the batch
+# atomically; callers that need all-or-nothing must validate rows first (see
+# importer.import_expenses). Rows that may already be stored (a retried
+# batch) must pass rebuild=True: the store keeps one record per id, but adding
+# them to the aggregates again would count them twice, so both are rebuilt
+# from the store afterwards instead. Returns the row count.
+@traced("storage.save_expense_batch")
+def save_expense_batch(username, rows, rebuild=False):
+    with user_lock(username):
+        rollup = None if rebuild else read_json(rollup_path(username), None)
+        recent = None if rebuild else read_json(recent_index_path(username), None)
+        newest = []
+        count = 0
+
+        def tracked_rows():
+            nonlocal count
+            for row in rows:
+                year, month, record = row[:3]
+                expense_id = row[3] if len(row) > 3 else str(uuid.uuid4())
+                if rollup is not None:
+                    add_to_rollup(rollup, year, month, record)
+                if recent is not None:
+                    entry = _recent_entry(year, month, expense_id, record)
+                    item = (entry["timestamp"], count, entry)
+                    if len(newest) < config.RECENT_INDEX_SIZE:
+                        heapq.heappush(newest, item)
+                    elif item > newest[0]:
+                        heapq.heapreplace(newest, item)
+                count += 1
+                yield (username, year, month, expense_id, record)
+
+        try:
+            get_store().save_many(tracked_rows())
+        except Exception:
+            # Rows written before the failure stay stored on the JSON and
+            # binary backends, so rebuild the rollup and recent index from
+            # what actually landed instead of leaving them stale
+            file_cache.invalidate(('expenses', username))
+            rebuild_rollup(username)
+            rebuild_recent_index(username)
+            raise
+        file_cache.invalidate(('expenses', username))
+
+        if rollup is None:
+            rebuild_rollup(username)
+        else:
+            _write_rollup(username, rollup)
+        if recent is None:
+            rebuild_recent_index(username)
+        else:
+            new_entries = [item[2] for item in sorted(newest, reverse=True)]
+            _write_recent_index(username, _newest(new_entries + recent, config.RECENT_INDEX_SIZE))
+    return count
+
+# Save a structured record array (binstore.RECORD_DTYPE, e.g. from
+# sample_data.generate_records) for one user. The binary store appends it as
+# is and the rollup and recent index are updated from the arrays; other stores
+# get the decoded rows through save_expense_batch. Returns the record count.
+@traced("storage.save_expense_array")
+def save_expense_array(username, records):
+    from binstore import array_rollup, decode_records
+    store = get_store()
+    if not hasattr(store, 'save_array'):
+        return save_expense_batch(username, ((year, month, record, expense_id)
+                                             for year, month, expense_id, record in decode_records(records)))
+
+    with user_lock(username):
+        rollup = read_json(rollup_path(username), None)
+        if rollup is None:
+            rollup = build_rollup(store.load_tree(username))
+        recent = read_json(recent_index_path(username), None)
+        if recent is None:
+            recent = rebuild_recent_index(username)
+
+        store.save_array(username, records)
+        file_cache.invalidate(('expenses', username))
+
+        _write_rollup(username, merge_rollup(rollup, array_rollup(records)))
+        newest = records[records["timestamp"].argsort()[::-1][:config.RECENT_INDEX_SIZE]]
+        new_entries = [_recent_entry(*row) for row in decode_records(newest)]
+        _write_recent_index(username, _newest(new_entries + recent, config.RECENT_INDEX_SIZE))
+    return len(records)
+
+def _copy_expenses(source, target):
+    migrated = {}
+    for username in source.usernames():
+        rows = [(username, year, month, expense_id, record)
+                for year, month, expense_id, record in source.iter_records(username)]
+        target.save_many(rows)
+        migrated[username] = len(rows)
+    return migrated
+
+# Copy every user's expenses from the JSON files into the SQLite store
+def migrate_json_to_sqlite(data_dir=None, db_path=None):
+    return _copy_expenses(JsonExpenseStore(data_dir or base_dir), SqliteExpenseStore(db_path or sqlite_path))
+
+# Copy every user's expenses from the JSON files into binary record files
+def migrate_json_to_binary(data_dir=None):
+    from binstore import BinaryExpenseStore
+    return _copy_expenses(JsonExpenseStore(data_dir or base_dir), BinaryExpenseStore(data_dir or base_dir))
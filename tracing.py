@@ -0,0 +1,165 @@
+import atexit
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import config
+
+# Latency histogram bucket upper bounds in milliseconds; the last bucket
+# collects everything slower
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Spans are only recorded while tracing is on: SMARTSPEND_TRACE=1, a trace
+# file or the developer panel turns it on at startup, enable()/disable() at
+# runtime. When off, span() hands out a shared no-op context and traced
+# functions add a single flag check.
+enabled = config.TRACE or config.DEV_PANEL or bool(config.TRACE_FILE)
+
+_lock = threading.Lock()
+_histograms = {}
+_recent = deque(maxlen=config.TRACE_BUFFER_SIZE)
+_local = threading.local()
+_trace_file = None
+_NOOP = nullcontext()
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    # Upper bound of the bucket holding the given quantile (capped at max)
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= q * self.count:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms or 0.0, 3),
+            "p50_ms": round(self.quantile(0.5), 3),
+            "p95_ms": round(self.quantile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+        }
+
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def _open_trace_file():
+    global _trace_file
+    if _trace_file is None and config.TRACE_FILE:
+        _trace_file = open(config.TRACE_FILE, "a", buffering=1)
+        atexit.register(_trace_file.close)
+    return _trace_file
+
+def _record(name, start, ms, attrs):
+    event = {"name": name, "start": start, "ms": round(ms, 4), "thread": threading.current_thread().name}
+    if attrs:
+        event["attrs"] = attrs
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(ms)
+        _recent.append(event)
+        trace_file = _open_trace_file()
+        if trace_file is not None:
+            trace_file.write(json.dumps(event, default=str) + "\n")
+    collected = getattr(_local, "collected", None)
+    if collected is not None:
+        collected.append(event)
+
+@contextmanager
+def _span(name, attrs):
+    start = time.time()
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, start, (time.perf_counter() - began) * 1000, attrs)
+
+# Time a block under name (e.g. "storage.load_expenses", "chart.expense_pie")
+def span(name, **attrs):
+    if not enabled:
+        return _NOOP
+    return _span(name, attrs)
+
+# Decorator timing every call of a function as a span
+def traced(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            with _span(name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Start collecting the spans this thread records (one Streamlit script run)
+# into the returned list, replacing any earlier collection
+def start_collecting():
+    _local.collected = collected = []
+    return collected
+
+def stop_collecting():
+    _local.collected = None
+
+# Histogram summaries by span name, slowest total first
+def histograms():
+    with _lock:
+        summaries = {name: histogram.summary() for name, histogram in _histograms.items()}
+    return dict(sorted(summaries.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+def bucket_counts(name):
+    with _lock:
+        histogram = _histograms.get(name)
+        return list(histogram.buckets) if histogram else []
+
+def recent_spans():
+    with _lock:
+        return list(_recent)
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _recent.clear()
+
+# Write the buffered recent spans as JSONL to a file object
+def dump_trace(f):
+    count = 0
+    for event in recent_spans():
+        f.write(json.dumps(event, default=str) + "\n")
+        count += 1
+    return count
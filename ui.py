@@ -0,0 +1,139 @@
+from datetime import datetime
+
+import streamlit as st
+
+import notifications
+import storage
+
+
+# Initialize session state variables if they don't exist
+def init_session_state():
+    if 'theme' not in st.session_state:
+        st.session_state.theme = 'light'
+    if 'notifications' not in st.session_state:
+        st.session_state.notifications = notifications.NotificationBuffer()
+    if 'expenses_history' not in st.session_state:
+        st.session_state.expenses_history = {}
+    if 'current_page' not in st.session_state:
+        st.session_state.current_page = "Dashboard"
+
+# Notifications belong to the selected profile and are kept in its
+# persistent store; until a profile exists they stay in a bounded buffer in
+# the session
+def _notification_user(username=None):
+    username = username or st.session_state.get('selected_profile')
+    return username if username and storage.load_user_profile(username) else None
+
+# Function to add notification
+def add_notification(message, type="info", username=None):
+    username = _notification_user(username)
+    if username:
+        notifications.add_notification(username, message, type)
+    else:
+        st.session_state.notifications.add(message, type)
+
+# Read-only view of the current notifications (see NotificationBuffer)
+def get_notifications(username=None):
+    username = _notification_user(username)
+    return notifications.load_notifications(username) if username else st.session_state.notifications
+
+def mark_notifications_read(ids=None, username=None):
+    username = _notification_user(username)
+    if username:
+        return notifications.mark_read(username, ids)
+    return st.session_state.notifications.mark_read(ids)
+
+# Toggle theme function
+def toggle_theme():
+    if st.session_state.theme == 'light':
+        st.session_state.theme = 'dark'
+    else:
+        st.session_state.theme = 'light'
+
+# Apply theme CSS
+def apply_theme():
+    if st.session_state.theme == 'dark':
+        st.markdown("""
+        <style>
+        .main {
+            background-color: #1E1E1E;
+            color: #FFFFFF;
+        }
+        .stButton button {
+            background-color: #4CAF50;
+            color: white;
+        }
+        .sidebar .sidebar-content {
+            background-color: #2D2D2D;
+            color: #FFFFFF;
+        }
+        h1, h2, h3, h4, h5, h6 {
+            color: #FFFFFF !important;
+        }
+        .css-145kmo2 {
+            color: #FFFFFF !important;
+        }
+        .stProgress > div > div {
+            background-color: #4CAF50 !important;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown("""
+        <style>
+        .stButton button {
+            background-color: #4CAF50;
+            color: white;
+        }
+        .stProgress > div > div {
+            background-color: #4CAF50 !important;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+# Sample expenses shown until the user records real ones. Built once per
+# process (and month) and shared by every session, so callers must treat the
+# frame as read-only.
+@st.cache_resource(show_spinner=False)
+def _sample_frame(month):
+    from frame import frame_from_records
+    from sample_data import sample_records
+    return frame_from_records(sample_records(), {})
+
+def get_sample_frame():
+    return _sample_frame(datetime.now().strftime("%Y-%m"))
+
+# Developer panel (SMARTSPEND_DEV_PANEL=1): spans of this run, latency
+# histograms since startup and a download of the buffered trace
+def render_dev_panel(run_spans):
+    import io
+    import plotly.express as px
+    import tracing
+
+    with st.expander("🛠️ Developer: timings"):
+        page_ms = sum(span["ms"] for span in run_spans if span["name"] == "page.render")
+        st.caption(f"This run: {len(run_spans)} spans, page render {page_ms:,.1f} ms")
+        st.dataframe([{"Span": span["name"], "ms": span["ms"]} for span in sorted(run_spans, key=lambda s: s["ms"], reverse=True)],
+                     use_container_width=True, hide_index=True)
+
+        summaries = tracing.histograms()
+        st.write("**Since startup**")
+        st.dataframe([{"Span": name, **summary} for name, summary in summaries.items()],
+                     use_container_width=True, hide_index=True)
+
+        if summaries:
+            name = st.selectbox("Latency histogram", list(summaries), key="dev_histogram")
+            labels = [f"≤{bound:g} ms" for bound in tracing.BUCKETS_MS] + [f">{tracing.BUCKETS_MS[-1]:g} ms"]
+            counts = tracing.bucket_counts(name)
+            st.plotly_chart(px.bar(x=labels, y=counts, labels={"x": "Duration", "y": "Calls"}), use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            trace = io.StringIO()
+            tracing.dump_trace(trace)
+            st.download_button("Download trace (JSONL)", trace.getvalue(), file_name="smartspend-trace.jsonl",
+                               mime="application/x-ndjson")
+        with col2:
+            if st.button("Reset timings"):
+                tracing.reset()
+                st.rerun()
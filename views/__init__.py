@@ -0,0 +1,35 @@
+import importlib
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Page name -> module rendering it. Modules are imported on first visit, so a
+# page's heavy dependencies (pandas, plotly) are only loaded when it is shown.
+PAGES = {
+    "Dashboard": "views.dashboard",
+    "Profile": "views.profile",
+    "Expenses": "views.expenses",
+    "Budget": "views.budget",
+    "Analytics": "views.analytics",
+    "Notifications": "views.notifications",
+}
+
+# Seconds spent on first imports in this process, by page name ("app" for app.py)
+import_times = {}
+
+
+def record_import_time(name, seconds):
+    if name not in import_times:
+        import_times[name] = seconds
+        logger.info("Imported %s in %.1f ms", name, seconds * 1000)
+
+def load_page(name):
+    module_name = PAGES[name]
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        record_import_time(name, time.perf_counter() - start)
+    return module
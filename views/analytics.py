@@ -0,0 +1,179 @@
+from datetime import datetime
+
+import streamlit as st
+
+import charts
+import config
+from storage import CATEGORIES, load_rollup
+from frame import (monthly_category_totals, rollup_monthly_totals, as_amount, period_totals, default_resolution,
+                   frame_between, date_range, RESOLUTIONS, DATE_RANGES)
+from ui import get_sample_frame
+
+
+# Analytics page
+def render(username, profile):
+    st.title("Financial Analytics")
+    
+    if profile:
+        rollup = load_rollup(username)
+        
+        if rollup:
+            monthly = rollup_monthly_totals(rollup)
+        else:
+            monthly = monthly_category_totals(get_sample_frame())
+        
+        range_col, res_col, window_col = st.columns(3)
+        with range_col:
+            range_name = st.selectbox("Date Range", [name for name in DATE_RANGES if name != "Custom"], key="analytics_range")
+        # Rollup rows are already one per month, so the range is applied to them
+        # directly rather than re-reading the matching expense records
+        monthly = frame_between(monthly, *date_range(range_name, datetime.now().date())).reset_index(drop=True)
+        
+        monthly_totals = [{"Month": month_name, "Total": as_amount(total), "Sort_Key": sort_key}
+                          for month_name, total, sort_key in zip(monthly["Month"], monthly["Total"], monthly["Sort_Key"])]
+        category_trends = {category: [{"Month": month_name, "Amount": as_amount(amount), "Category": category, "Sort_Key": sort_key}
+                                      for month_name, amount, sort_key in zip(monthly["Month"], monthly[category], monthly["Sort_Key"])]
+                           for category in CATEGORIES}
+        
+        resolution_labels = {"month": "Monthly", "quarter": "Quarterly", "year": "Yearly", "rolling": "Rolling average"}
+        with res_col:
+            resolution = st.selectbox("Chart resolution", RESOLUTIONS,
+                                      index=RESOLUTIONS.index(default_resolution(monthly, config.CHART_MAX_POINTS)),
+                                      format_func=resolution_labels.get)
+        window = 3
+        if resolution == "rolling":
+            with window_col:
+                window = st.number_input("Rolling window (months)", min_value=2, max_value=36, value=3, step=1)
+        periods = period_totals(monthly, resolution, window, config.CHART_MAX_POINTS)
+        period_labels = tuple(periods["Month"])
+        if len(periods) < len(monthly) and resolution == "month":
+            st.caption(f"Charts show the latest {len(periods)} months; pick a coarser resolution to see the full history.")
+        
+        tab1, tab2, tab3 = st.tabs(["Spending Trends", "Category Analysis", "Savings Analysis"])
+        
+        with tab1:
+            st.subheader("Monthly Spending Trends")
+            
+            if monthly_totals:
+                fig = charts.monthly_trend_line(period_labels, tuple(periods["Total"].map(as_amount)),
+                                                title=f"Total {resolution_labels[resolution]} Expenses")
+                charts.plot("monthly_trend_line", fig)
+                
+                avg_spending = sum(item["Total"] for item in monthly_totals) / len(monthly_totals)
+                max_month = max(monthly_totals, key=lambda x: x["Total"])
+                min_month = min(monthly_totals, key=lambda x: x["Total"])
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Average Monthly Spending", f"₹{avg_spending:,.2f}")
+                with col2:
+                    st.metric("Highest Spending Month", f"{max_month['Month']}: ₹{max_month['Total']:,}")
+                with col3:
+                    st.metric("Lowest Spending Month", f"{min_month['Month']}: ₹{min_month['Total']:,}")
+                
+                if len(monthly_totals) > 1:
+                    recent_months = monthly_totals[-3:] if len(monthly_totals) >= 3 else monthly_totals
+                    recent_avg = sum(item["Total"] for item in recent_months) / len(recent_months)
+                    
+                    if recent_avg > avg_spending * 1.1:
+                        st.warning("⚠️ Your recent spending is higher than your historical average.")
+                    elif recent_avg < avg_spending * 0.9:
+                        st.success("👍 Your recent spending is lower than your historical average.")
+            else:
+                st.info("Not enough data to show spending trends")
+        
+        with tab2:
+            st.subheader("Category Spending Analysis")
+            
+            if monthly_totals:
+                fig = charts.category_stacked_bar(period_labels, tuple(CATEGORIES),
+                                                  tuple(tuple(periods[category].map(as_amount)) for category in CATEGORIES),
+                                                  title=f"{resolution_labels[resolution]} Spending by Category")
+                charts.plot("category_stacked_bar", fig)
+                
+                if len(monthly_totals) > 0:
+                    st.subheader("Category Comparison")
+                    
+                    category_avgs = {}
+                    for category in category_trends:
+                        if category_trends[category]:
+                            category_avgs[category] = sum(item["Amount"] for item in category_trends[category]) / len(category_trends[category])
+                    
+                    sorted_categories = sorted(category_avgs.items(), key=lambda x: x[1], reverse=True)
+                    
+                    fig2 = charts.category_average_bar(tuple(cat for cat, avg in sorted_categories),
+                                                       tuple(avg for cat, avg in sorted_categories))
+                    
+                    charts.plot("category_average_bar", fig2)
+                    
+                    if sorted_categories:
+                        top_category = sorted_categories[0]
+                        st.write(f"Your highest spending category is **{top_category[0]}** with an average of ₹{top_category[1]:,.2f} per month.")
+                        
+                        category_percent = (top_category[1] / avg_spending) * 100
+                        st.write(f"This represents **{category_percent:.1f}%** of your monthly expenses.")
+                        
+                        if category_percent > 30:
+                            st.warning("This category consumes a significant portion of your budget. Consider finding ways to reduce spending here.")
+            else:
+                st.info("Not enough data to show category analysis")
+        
+        with tab3:
+            st.subheader("Savings Analysis")
+            
+            if monthly_totals:
+                savings_data = []
+                
+                for item in monthly_totals:
+                    savings = profile["Income"] - item["Total"]
+                    savings_percent = (savings / profile["Income"]) * 100 if profile["Income"] > 0 else 0
+                    savings_data.append({
+                        "Month": item["Month"],
+                        "Savings": savings,
+                        "SavingsPercent": savings_percent,
+                        "Sort_Key": item["Sort_Key"]
+                    })
+                
+                savings_data.sort(key=lambda x: x["Sort_Key"])
+                
+                fig = charts.savings_figure(tuple(item["Month"] for item in savings_data),
+                                            tuple(item["Savings"] for item in savings_data),
+                                            tuple(item["SavingsPercent"] for item in savings_data),
+                                            profile["Desired_Savings_Percentage"])
+                
+                charts.plot("savings_figure", fig)
+                
+                avg_savings_percent = sum(item["SavingsPercent"] for item in savings_data) / len(savings_data)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Average Monthly Savings", 
+                          f"₹{sum(item['Savings'] for item in savings_data) / len(savings_data):,.2f}")
+                
+                with col2:
+                    st.metric("Average Savings Percentage", 
+                          f"{avg_savings_percent:.1f}%", 
+                          delta=f"{avg_savings_percent - profile['Desired_Savings_Percentage']:.1f}%",
+                          delta_color="normal" if avg_savings_percent >= profile['Desired_Savings_Percentage'] else "inverse")
+                
+                if profile.get("Financial_Goals"):
+                    st.subheader("Progress Towards Financial Goals")
+                    st.write(profile["Financial_Goals"])
+                    
+                    total_saved = sum(item["Savings"] for item in savings_data)
+                    st.write(f"Total saved so far: ₹{total_saved:,}")
+                    
+                    if len(savings_data) > 0:
+                        avg_monthly_savings = sum(item["Savings"] for item in savings_data) / len(savings_data)
+                        
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Projected 1-Year Savings", f"₹{avg_monthly_savings * 12:,.2f}")
+                        with col2:
+                            st.metric("Projected 3-Year Savings", f"₹{avg_monthly_savings * 36:,.2f}")
+                        with col3:
+                            st.metric("Projected 5-Year Savings", f"₹{avg_monthly_savings * 60:,.2f}")
+            else:
+                st.info("Not enough data to show savings analysis")
+    else:
+        st.info("Please select or create a user profile to view analytics")
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from storage import CATEGORIES, load_budget_goals, save_budget_goals, load_rollup, rollup_category_totals
+from finance import default_budget_goals, as_amount
+from budgets import evaluate_budgets, category_vector
+from ui import add_notification, get_sample_frame
+
+
+# Budget page
+def render(username, profile):
+    st.title("Budget Planning & Tracking")
+    
+    if profile:
+        budget_goals = load_budget_goals(username)
+        
+        if not budget_goals:
+            budget_goals = default_budget_goals(profile)
+        
+        current_month = datetime.now().month
+        current_year = datetime.now().year
+        
+        category_totals = rollup_category_totals(load_rollup(username), current_year, current_month)
+        monthly_total = sum(category_totals.values())
+        
+        if monthly_total == 0:
+            # pandas is only needed for the sample data fallback
+            from frame import month_rows, category_totals as frame_category_totals
+            category_totals = frame_category_totals(month_rows(get_sample_frame(), current_year, current_month))
+            monthly_total = sum(category_totals.values())
+        
+        st.subheader("Set Your Budget Goals")
+        
+        col1, col2 = st.columns(2)
+        updated_budget = {}
+        
+        with col1:
+            for i, category in enumerate(list(category_totals.keys())[:4]):
+                updated_budget[category] = st.number_input(
+                    f"{category} Budget (₹)",
+                    min_value=0,
+                    value=int(budget_goals.get(category, 0)),
+                    key=f"budget_{category}"
+                )
+        
+        with col2:
+            for i, category in enumerate(list(category_totals.keys())[4:]):
+                updated_budget[category] = st.number_input(
+                    f"{category} Budget (₹)",
+                    min_value=0,
+                    value=int(budget_goals.get(category, 0)),
+                    key=f"budget_{category}"
+                )
+        
+        if st.button("Save Budget Goals"):
+            save_budget_goals(username, updated_budget)
+            st.success("Budget goals saved successfully!")
+            add_notification("Budget goals updated", "success")
+            st.rerun()
+        
+        st.subheader("Budget Progress for Current Month")
+        
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        with col1:
+            st.write("**Category**")
+        with col2:
+            st.write("**Budget**")
+        with col3:
+            st.write("**Spent**")
+        with col4:
+            st.write("**Remaining**")
+        
+        st.markdown("---")
+        
+        evaluation = evaluate_budgets(category_vector(category_totals), category_vector(budget_goals))
+        
+        for i, category in enumerate(CATEGORIES):
+            col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+            
+            budget = budget_goals.get(category, 0)
+            spent = category_totals.get(category, 0)
+            remaining = as_amount(evaluation["remaining"][i])
+            percentage = evaluation["percent"][i]
+            
+            with col1:
+                st.write(category)
+                st.progress(min(percentage/100, 1.0))
+            
+            with col2:
+                st.write(f"₹{budget:,}")
+            
+            with col3:
+                st.write(f"₹{spent:,}")
+            
+            with col4:
+                if remaining >= 0:
+                    st.write(f"₹{remaining:,}")
+                else:
+                    st.write(f"**-₹{abs(remaining):,}**")
+        
+        st.markdown("---")
+        total_budget = sum(budget_goals.values())
+        
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        with col1:
+            st.write("**TOTAL**")
+            overall_percentage = float(evaluate_budgets(monthly_total, total_budget)["percent"])
+            st.progress(min(overall_percentage/100, 1.0))
+        
+        with col2:
+            st.write(f"**₹{total_budget:,}**")
+        
+        with col3:
+            st.write(f"**₹{monthly_total:,}**")
+        
+        with col4:
+            remaining = total_budget - monthly_total
+            if remaining >= 0:
+                st.write(f"**₹{remaining:,}**")
+            else:
+                st.write(f"**-₹{abs(remaining):,}**")
+        
+        st.subheader("Smart Budget Suggestions")
+        
+        savings = profile['Income'] - monthly_total
+        savings_percentage = (savings / profile['Income']) * 100 if profile['Income'] > 0 else 0
+        
+        if savings_percentage < profile['Desired_Savings_Percentage']:
+            st.warning(f"You're currently saving {savings_percentage:.1f}% of your income, which is below your goal of {profile['Desired_Savings_Percentage']}%.")
+            
+            overspend = evaluation["overspend"]
+            overspent_categories = [i for i in np.argsort(-overspend, kind="stable") if overspend[i] > 0]
+            
+            if overspent_categories:
+                st.write("Consider reducing spending in these categories:")
+                for i in overspent_categories:
+                    st.write(f"- {CATEGORIES[i]}: Over budget by ₹{as_amount(overspend[i]):,}")
+        else:
+            st.success(f"Great job! You're saving {savings_percentage:.1f}% of your income, which meets or exceeds your goal of {profile['Desired_Savings_Percentage']}%.")
+            
+            if savings > 10000:
+                st.write("Consider putting some of your savings into investments:")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("- Emergency fund (3-6 months of expenses)")
+                    st.write("- Fixed deposits for short-term goals")
+                with col2:
+                    st.write("- Mutual funds for long-term growth")
+                    st.write("- Tax-saving investments")
+    else:
+        st.info("Please select or create a user profile to plan your budget")
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import charts
+from storage import CATEGORIES, load_budget_goals, load_rollup, rollup_category_totals, load_recent_expenses
+from frame import month_rows, category_totals as frame_category_totals, recent_expenses, as_amount
+from finance import default_budget_goals
+from budgets import evaluate_budgets, category_vector, ALERT_NEAR_LIMIT, ALERT_OVERSPENT
+from ui import get_sample_frame
+
+
+# Dashboard page
+def render(username, profile):
+    st.title("💸 SmartSpend - Dashboard")
+    
+    if profile:
+        # Display quick stats
+        st.subheader("Financial Overview")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        current_month = datetime.now().month
+        current_year = datetime.now().year
+        
+        category_totals = rollup_category_totals(load_rollup(username), current_year, current_month)
+        monthly_total = sum(category_totals.values())
+        
+        if monthly_total == 0:
+            st.info("No expenses recorded for this month. Showing sample data for demonstration.")
+            category_totals = frame_category_totals(month_rows(get_sample_frame(), current_year, current_month))
+            monthly_total = sum(category_totals.values())
+        
+        with col1:
+            st.metric("Monthly Income", f"₹{profile['Income']:,}")
+        
+        with col2:
+            st.metric("Total Expenses", f"₹{monthly_total:,}")
+        
+        with col3:
+            savings = profile['Income'] - monthly_total
+            savings_percentage = (savings / profile['Income']) * 100 if profile['Income'] > 0 else 0
+            diff = savings_percentage - profile['Desired_Savings_Percentage']
+            
+            st.metric("Savings", f"₹{savings:,} ({savings_percentage:.1f}%)", 
+                     delta=f"{diff:.1f}%" if diff != 0 else None,
+                     delta_color="normal" if diff >= 0 else "inverse")
+        
+        # Budget tracking progress bars
+        st.subheader("Budget Tracking")
+        
+        budget_goals = load_budget_goals(username)
+        
+        if not budget_goals:
+            budget_goals = default_budget_goals(profile)
+        
+        evaluation = evaluate_budgets(category_vector(category_totals), category_vector(budget_goals))
+        
+        for i, category in enumerate(CATEGORIES):
+            if category not in budget_goals:
+                continue
+            spent = category_totals[category]
+            budget = budget_goals[category]
+            percentage = evaluation["percent"][i]
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.progress(min(percentage/100, 1.0))
+            with col2:
+                st.write(f"{category}: ₹{spent:,} / ₹{budget:,}")
+            
+            if evaluation["level"][i] == ALERT_OVERSPENT:
+                st.warning(f"⚠️ Overspent on {category} by ₹{as_amount(evaluation['overspend'][i]):,}")
+            elif evaluation["level"][i] == ALERT_NEAR_LIMIT:
+                st.info(f"ℹ️ Close to {category} budget limit ({percentage:.1f}%)")
+        
+        # Recent activity
+        st.subheader("Recent Activity")
+        
+        recent_activities = [{
+            "Date": entry["timestamp"],
+            "Total": sum(entry["record"][cat] for cat in CATEGORIES if isinstance(entry["record"].get(cat), (int, float))),
+            "Details": entry["record"]
+        } for entry in load_recent_expenses(username, 5)]
+        
+        if not recent_activities:
+            recent_activities = [{
+                "Date": row["timestamp"],
+                "Total": as_amount(row["total"]),
+                "Details": {cat: as_amount(row[cat]) for cat in CATEGORIES}
+            } for row in recent_expenses(get_sample_frame(), 5).to_dict('records')]
+        
+        for activity in recent_activities:
+            with st.expander(f"Expense on {activity['Date']} - ₹{activity['Total']:,}"):
+                for category, amount in activity['Details'].items():
+                    if category in category_totals:
+                        st.write(f"{category}: ₹{amount:,}")
+        
+        # Quick insights
+        st.subheader("Quick Insights")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            expense_data = pd.DataFrame(list(category_totals.items()), columns=["Category", "Amount"])
+            expense_data = expense_data[expense_data["Amount"] > 0]
+            
+            if not expense_data.empty:
+                fig = charts.expense_pie(tuple(expense_data["Category"]), tuple(expense_data["Amount"]))
+                charts.plot("expense_pie", fig)
+            else:
+                st.info("No expense data to show")
+        
+        with col2:
+            sorted_expenses = expense_data.sort_values("Amount", ascending=False)
+            
+            if not sorted_expenses.empty:
+                top_expenses = sorted_expenses.head(3)
+                fig2 = charts.top_categories_bar(tuple(top_expenses["Category"]), tuple(top_expenses["Amount"]))
+                charts.plot("top_categories_bar", fig2)
+            else:
+                st.info("No expense data to show")
+    else:
+        st.info("Please select or create a user profile to view the dashboard")
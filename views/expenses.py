@@ -0,0 +1,293 @@
+import calendar
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import config
+from storage import CATEGORIES, load_budget_goals, load_rollup
+from writequeue import save_expenses_deferred
+from alerts import request_check
+from frame import get_range_frame, frame_between, page_after, as_amount, date_range, DATE_RANGES
+from ui import add_notification, get_sample_frame
+
+
+# Remove the session's prepared export file, if any
+def discard_export():
+    prepared = st.session_state.pop('export_file', None)
+    if prepared and os.path.exists(prepared[1]):
+        os.remove(prepared[1])
+
+# Expenses page: entry form, history, import and export
+def render(username, profile):
+    st.title("Expense Tracker")
+    
+    if profile:
+        tab1, tab2, tab3 = st.tabs(["Enter Expenses", "Expense History", "Import & Export"])
+        
+        with tab1:
+            st.subheader("Enter Your Monthly Expenses")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                current_month = datetime.now().month
+                current_year = datetime.now().year
+                
+                month = st.selectbox("Month", 
+                                 options=list(range(1, 13)),
+                                 index=current_month - 1,
+                                 format_func=lambda x: calendar.month_name[x])
+            
+            with col2:
+                year = st.selectbox("Year", 
+                               options=list(range(current_year - 2, current_year + 1)),
+                               index=2)
+            
+            categories = {
+                "Groceries": "Food items, household supplies, etc.",
+                "Transport": "Fuel, public transport, ride-sharing, etc.",
+                "Eating_Out": "Restaurants, cafes, food delivery, etc.",
+                "Entertainment": "Movies, events, subscriptions, etc.",
+                "Utilities": "Electricity, water, internet, mobile, etc.",
+                "Healthcare": "Medicines, doctor visits, insurance, etc.",
+                "Education": "Courses, books, tuition, etc.",
+                "Miscellaneous": "Other expenses not fitting above categories"
+            }
+            
+            expenses = {}
+            st.write("Fill in your expenses for each category:")
+            
+            col1, col2 = st.columns(2)
+            cat_list = list(categories.items())
+            mid_point = len(cat_list) // 2
+            
+            with col1:
+                for category, description in cat_list[:mid_point]:
+                    expenses[category] = st.number_input(
+                        f"{category} (₹)", 
+                        min_value=0,
+                        help=description,
+                        key=f"expense_{category}"
+                    )
+            
+            with col2:
+                for category, description in cat_list[mid_point:]:
+                    expenses[category] = st.number_input(
+                        f"{category} (₹)", 
+                        min_value=0,
+                        help=description,
+                        key=f"expense_{category}"
+                    )
+            
+            notes = st.text_area("Notes (Optional)", placeholder="Any additional information about this month's expenses")
+            
+            if st.button("Save Expenses"):
+                expenses["notes"] = notes
+                expense_id = save_expenses_deferred(expenses, username, month, year)
+                st.success("Expenses saved successfully!")
+                total_expense = sum([
+float(amount) for category, amount in expenses.items()
+if category != "notes" and str(amount).replace('.', '', 1).isdigit()
+])
+                add_notification(f"New expense entry of ₹{total_expense:,} added", "success")
+                
+                budget_goals = load_budget_goals(username)
+                if budget_goals:
+                    warnings = []
+                    for category, amount in expenses.items():
+                        if category in budget_goals and category != "notes":
+                            if amount > budget_goals[category]:
+                                warnings.append(f"Overspent on {category} by ₹{amount - budget_goals[category]:,}")
+                    
+                    if warnings:
+                        warning_msg = "\n".join(warnings)
+                        st.warning(warning_msg)
+                
+                # Monthly budget alerts come from the background scheduler
+                request_check(username)
+        
+        with tab2:
+            st.subheader("Expense History")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                history_range = st.selectbox("Date Range", options=DATE_RANGES, index=0, key="history_range")
+            
+            with col2:
+                history_categories = st.multiselect("Categories", options=CATEGORIES, key="history_categories")
+            
+            today = datetime.now().date()
+            if history_range == "Custom":
+                col1, col2 = st.columns(2)
+                with col1:
+                    range_start = st.date_input("From", value=today.replace(day=1), key="history_start")
+                with col2:
+                    range_end = st.date_input("To", value=today, key="history_end")
+                st.caption("Expenses are filed by month, so whole months are included.")
+            else:
+                range_start, range_end = date_range(history_range, today)
+            
+            history_frame = get_range_frame(username, range_start, range_end, history_categories)
+            
+            # The small monthly rollup tells whether the user has any expenses
+            # at all, without loading the full history
+            if history_frame.empty and not load_rollup(username):
+                history_frame = frame_between(get_sample_frame(), range_start, range_end, history_categories)
+            
+            # Page through the newest entries first; history_cursors holds the
+            # cursor each visited page started after, reset whenever the user
+            # or the filters change
+            history_filters = (username, range_start, range_end, tuple(history_categories))
+            if st.session_state.get('history_filters') != history_filters:
+                st.session_state.history_filters = history_filters
+                st.session_state.history_cursors = [None]
+            
+            page_size = st.session_state.get('history_page_size', config.HISTORY_PAGE_SIZE)
+            page_frame = page_after(history_frame, st.session_state.history_cursors[-1], page_size)
+            filtered_expenses = page_frame.to_dict('records')
+            
+            if filtered_expenses:
+                for expense in filtered_expenses:
+                    if pd.notna(expense['date']):
+                        formatted_date = expense['date'].strftime("%b %d, %Y")
+                    else:
+                        formatted_date = f"{calendar.month_name[expense['month']]} {expense['year']}"
+                    
+                    # Details are only built for entries the user opens
+                    if st.toggle(f"{formatted_date} - ₹{as_amount(expense['total']):,}", key=f"history_open_{expense['id']}"):
+                        col1, col2 = st.columns(2)
+                        items = [(cat, as_amount(expense[cat])) for cat in categories.keys()]
+                        mid_point = len(items) // 2
+                        
+                        with col1:
+                            for category, amount in items[:mid_point]:
+                                st.write(f"**{category}:** ₹{amount:,}")
+                        
+                        with col2:
+                            for category, amount in items[mid_point:]:
+                                st.write(f"**{category}:** ₹{amount:,}")
+                        
+                        if expense['notes']:
+                            st.write("**Notes:**")
+                            st.write(expense['notes'])
+                
+                page_number = len(st.session_state.history_cursors)
+                has_more = not page_after(history_frame, filtered_expenses[-1]['cursor'], 1).empty
+                page_sizes = sorted({10, 20, 50, 100, config.HISTORY_PAGE_SIZE})
+                
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    if page_number > 1 and st.button("← Newer"):
+                        st.session_state.history_cursors.pop()
+                        st.rerun()
+                with col2:
+                    st.caption(f"Page {page_number} · {len(history_frame)} entries")
+                    st.selectbox("Entries per page", options=page_sizes,
+                                 index=page_sizes.index(page_size), key="history_page_size")
+                with col3:
+                    if has_more and st.button("Older →"):
+                        st.session_state.history_cursors.append(filtered_expenses[-1]['cursor'])
+                        st.rerun()
+            else:
+                st.info("No expense records found for the selected filters.")
+        
+        with tab3:
+            st.subheader("Import Expenses")
+            st.write("Upload a CSV or Parquet export, e.g. from your bank.")
+            
+            uploaded_file = st.file_uploader("Expense file", type=["csv", "parquet"])
+            
+            if uploaded_file is not None:
+                import importer
+                
+                fmt = importer.detect_format(uploaded_file.name)
+                sample = importer.preview(uploaded_file, fmt)
+                uploaded_file.seek(0)
+                columns = list(sample.columns)
+                
+                st.dataframe(sample, use_container_width=True)
+                
+                layout = st.radio("File layout", ["One column per category", "Category and amount columns"], horizontal=True)
+                date_column = st.selectbox("Date column", columns,
+                                           index=columns.index("date") if "date" in columns else 0)
+                notes_column = st.selectbox("Notes column (optional)", [None] + columns,
+                                            format_func=lambda x: "-- None --" if x is None else x)
+                absolute = st.checkbox("Negative amounts are spending (debits)",
+                                       help="Positive amounts (credits such as salary) are skipped")
+                
+                mapping = {}
+                category_column = None
+                amount_column = None
+                
+                if layout == "One column per category":
+                    guessed = {category: column for column, category in importer.guess_mapping(columns).items()}
+                    col1, col2 = st.columns(2)
+                    for i, category in enumerate(CATEGORIES):
+                        with col1 if i < len(CATEGORIES) // 2 else col2:
+                            options = [None] + columns
+                            source = st.selectbox(f"{category} column", options,
+                                                  index=options.index(guessed.get(category)),
+                                                  format_func=lambda x: "-- Not in file --" if x is None else x,
+                                                  key=f"import_map_{category}")
+                            if source is not None:
+                                mapping[source] = category
+                else:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        category_column = st.selectbox("Category column", columns)
+                    with col2:
+                        amount_column = st.selectbox("Amount column", columns,
+                                                     index=columns.index("amount") if "amount" in columns else 0)
+                    st.caption("Category values matching a SmartSpend category are used as-is; anything else goes to Miscellaneous.")
+                
+                if st.button("Import Expenses"):
+                    if layout == "One column per category" and not mapping:
+                        st.error("Map at least one column to a category")
+                    else:
+                        try:
+                            with st.spinner("Importing..."):
+                                result = importer.import_expenses(username, uploaded_file, fmt,
+                                                                  date_column=date_column,
+                                                                  mapping=mapping,
+                                                                  category_column=category_column,
+                                                                  amount_column=amount_column,
+                                                                  notes_column=notes_column,
+                                                                  absolute=absolute)
+                        except ValueError as e:
+                            st.error(f"Import failed: {e}")
+                        else:
+                            st.success(f"Imported {result.imported:,} expense records")
+                            add_notification(f"Imported {result.imported:,} expense records", "success")
+                            if result.skipped:
+                                st.warning(f"Skipped {result.skipped:,} rows:\n" + "\n".join(result.errors))
+            
+            st.subheader("Export Expenses")
+            
+            import exporter
+            
+            export_format = st.selectbox("Export format", list(exporter.EXPORT_FORMATS), format_func=str.upper)
+            
+            # Exports are only built on request, into a temporary file; the
+            # session keeps just its path, tagged with the user and format
+            export_key = (username, export_format)
+            prepared = st.session_state.get('export_file')
+            if prepared and prepared[0] != export_key:
+                discard_export()
+                prepared = None
+            
+            if st.button("Prepare Export"):
+                discard_export()
+                with st.spinner("Exporting..."):
+                    prepared = (export_key, exporter.export_to_temp_path(username, export_format))
+                    st.session_state.export_file = prepared
+            
+            if prepared and os.path.exists(prepared[1]):
+                with open(prepared[1], "rb") as f:
+                    st.download_button("Download Export", data=f,
+                                       file_name=f"{username}_expenses.{export_format}",
+                                       mime=exporter.EXPORT_FORMATS[export_format],
+                                       on_click=discard_export)
+    else:
+        st.info("Please select or create a user profile to track expenses")
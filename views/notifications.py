@@ -0,0 +1,102 @@
+import time
+
+import streamlit as st
+
+import config
+from notifications import NOTIFICATION_TYPES
+from ui import add_notification, get_notifications, mark_notifications_read
+
+
+# Notifications page
+def render(username, profile):
+    st.title("Notifications & Alerts")
+    
+    inbox = get_notifications(username)
+    
+    if len(inbox):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            filter_type = st.selectbox("Filter by Type", 
+                                   options=["All"] + NOTIFICATION_TYPES, 
+                                   index=0)
+        
+        with col2:
+            filter_status = st.selectbox("Status", options=["All", "Unread", "Read"], index=0)
+        
+        with col3:
+            st.metric("Unread", inbox.unread_count())
+            mark_all_read = st.button("Mark All As Read")
+            if mark_all_read:
+                mark_notifications_read(username=username)
+                st.success("All notifications marked as read")
+                time.sleep(1)
+                st.rerun()
+        
+        # Start from the newest page whenever the user or the filters change
+        filters = (username, filter_type, filter_status)
+        if st.session_state.get('notification_filters') != filters:
+            st.session_state.notification_filters = filters
+            st.session_state.notification_page = 0
+        page_size = config.NOTIFICATION_PAGE_SIZE
+        filtered_notifications, total = inbox.page(None if filter_type == "All" else filter_type,
+                                                   None if filter_status == "All" else filter_status == "Read",
+                                                   st.session_state.notification_page * page_size, page_size)
+        
+        if not filtered_notifications:
+            st.info("No notifications match these filters")
+        
+        for notification in filtered_notifications:
+            if notification["type"] == "success":
+                icon = "✅"
+                bg_color = "#d4edda"
+                text_color = "#155724"
+            elif notification["type"] == "warning":
+                icon = "⚠️"
+                bg_color = "#fff3cd"
+                text_color = "#856404"
+            elif notification["type"] == "error":
+                icon = "❌"
+                bg_color = "#f8d7da"
+                text_color = "#721c24"
+            else:
+                icon = "ℹ️"
+                bg_color = "#d1ecf1"
+                text_color = "#0c5460"
+            
+            with st.expander(f"{icon} {notification['message']} ({notification['timestamp']})"):
+                st.write(f"**Type:** {notification['type'].capitalize()}")
+                st.write(f"**Time:** {notification['timestamp']}")
+                
+                if not notification["read"]:
+                    mark_read = st.button("Mark as Read", key=f"mark_read_{notification['id']}")
+                    if mark_read:
+                        mark_notifications_read([notification["id"]], username)
+                        st.success("Notification marked as read")
+                        time.sleep(1)
+                        st.rerun()
+
+                else:
+                    st.write("**Status:** Read")
+        
+        if total > page_size:
+            page_count = -(-total // page_size)
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.session_state.notification_page > 0 and st.button("◀ Newer", key="notification_prev"):
+                    st.session_state.notification_page -= 1
+                    st.rerun()
+            with col2:
+                st.caption(f"Page {st.session_state.notification_page + 1} of {page_count} · {total} notifications")
+            with col3:
+                if st.session_state.notification_page < page_count - 1 and st.button("Older ▶", key="notification_next"):
+                    st.session_state.notification_page += 1
+                    st.rerun()
+    else:
+        st.info("No notifications to display")
+        
+        if st.button("Generate Sample Notifications"):
+            add_notification("Welcome to SmartSpend!", "info")
+            add_notification("Profile created successfully", "success")
+            add_notification("You're close to your budget limit for Groceries", "warning")
+            add_notification("Failed to save expenses", "error")
+            st.rerun()
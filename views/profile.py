@@ -0,0 +1,109 @@
+import streamlit as st
+
+from storage import save_user_profile
+from ui import add_notification
+
+
+# Profile page: create a new profile or edit the selected one
+def render(username, profile):
+    st.title("User Profile")
+    
+    if username == "-- Create New Profile --":
+        st.subheader("Create a New Profile")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            user_name = st.text_input("Name")
+            age = st.number_input("Age", min_value=18, max_value=120)
+            occupation = st.selectbox("Occupation", ["Professional", "Self_Employed", "Student", "Retired"])
+        
+        with col2:
+            city_tier = st.selectbox("City Tier", ["Tier_1", "Tier_2", "Tier_3"])
+            income = st.number_input("Monthly Income (₹)", min_value=1000)
+            dependents = st.number_input("Dependents", min_value=0)
+        
+        st.subheader("Financial Goals")
+        desired_savings_percentage = st.slider("Desired Savings Percentage", min_value=0, max_value=50, value=20, step=1)
+        
+        with st.expander("Advanced Profile Settings"):
+            financial_goals = st.text_area("Financial Goals (Optional)", 
+                                        placeholder="Example: Save for a house down payment in 2 years")
+            risk_profile = st.select_slider("Investment Risk Profile", 
+                                        options=["Conservative", "Moderate", "Aggressive"], value="Moderate")
+            has_investments = st.checkbox("I have existing investments")
+            has_loans = st.checkbox("I have existing loans")
+        
+        if st.button("Save Profile"):
+            profile = {
+                "Name": user_name,
+                "Age": age,
+                "Occupation": occupation,
+                "City_Tier": city_tier,
+                "Income": income,
+                "Dependents": dependents,
+                "Desired_Savings_Percentage": desired_savings_percentage,
+                "Financial_Goals": financial_goals if 'financial_goals' in locals() else "",
+                "Risk_Profile": risk_profile if 'risk_profile' in locals() else "Moderate",
+                "Has_Investments": has_investments if 'has_investments' in locals() else False,
+                "Has_Loans": has_loans if 'has_loans' in locals() else False
+            }
+            save_user_profile(profile, user_name)
+            st.success(f"Profile for {user_name} saved successfully!")
+            add_notification(f"New profile created for {user_name}", "success", username=user_name)
+            st.session_state.current_page = "Dashboard"
+            st.rerun()
+
+    
+    elif profile:
+        st.subheader(f"Edit Profile for {profile['Name']}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            age = st.number_input("Age", min_value=18, max_value=120, value=profile.get('Age', 30))
+            occupation = st.selectbox("Occupation", 
+                                 options=["Professional", "Self_Employed", "Student", "Retired"],
+                                 index=["Professional", "Self_Employed", "Student", "Retired"].index(profile.get('Occupation', 'Professional')))
+        
+        with col2:
+            city_tier = st.selectbox("City Tier", 
+                                options=["Tier_1", "Tier_2", "Tier_3"],
+                                index=["Tier_1", "Tier_2", "Tier_3"].index(profile.get('City_Tier', 'Tier_1')))
+            income = st.number_input("Monthly Income (₹)", min_value=1000, value=profile.get('Income', 50000))
+            dependents = st.number_input("Dependents", min_value=0, value=profile.get('Dependents', 0))
+        
+        st.subheader("Financial Goals")
+        desired_savings_percentage = st.slider("Desired Savings Percentage", 
+                                          min_value=0, max_value=50, 
+                                          value=profile.get('Desired_Savings_Percentage', 20), 
+                                          step=1)
+        
+        with st.expander("Advanced Profile Settings"):
+            financial_goals = st.text_area("Financial Goals", 
+                                        value=profile.get('Financial_Goals', ""))
+            risk_profile = st.select_slider("Investment Risk Profile", 
+                                        options=["Conservative", "Moderate", "Aggressive"], 
+                                        value=profile.get('Risk_Profile', "Moderate"))
+            has_investments = st.checkbox("I have existing investments", value=profile.get('Has_Investments', False))
+            has_loans = st.checkbox("I have existing loans", value=profile.get('Has_Loans', False))
+        
+        if st.button("Update Profile"):
+            updated_profile = {
+                "Name": profile["Name"],
+                "Age": age,
+                "Occupation": occupation,
+                "City_Tier": city_tier,
+                "Income": income,
+                "Dependents": dependents,
+                "Desired_Savings_Percentage": desired_savings_percentage,
+                "Financial_Goals": financial_goals,
+                "Risk_Profile": risk_profile,
+                "Has_Investments": has_investments,
+                "Has_Loans": has_loans
+            }
+            save_user_profile(updated_profile, profile["Name"])
+            st.success(f"Profile for {profile['Name']} updated successfully!")
+            add_notification(f"Profile updated for {profile['Name']}", "success")
+            st.rerun()
+
+    else:
+        st.info("Please select a user profile to edit or create a new one")
@@ -0,0 +1,246 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import config
+import storage
+from fsutil import sync
+
+logger = logging.getLogger(__name__)
+
+
+# Background writer for expense saves. submit() assigns the id and timestamp
+# and returns at once; a worker thread groups pending records per user and
+# writes each group with storage.save_expense_batch once max_batch records are
+# waiting or the oldest has waited max_delay seconds. Queued records become
+# visible to loads after they are flushed. A user's rows that fail max_retries
+# writes in a row, or are still unwritten at close(), are parked in
+# {username}_unsent.jsonl and queued again by the next write queue. A
+# failed write may have stored some rows already, so a user's batch that holds
+# retried or parked rows is written with rebuild=True.
+class ExpenseWriteQueue:
+    def __init__(self, max_batch=config.WRITE_BATCH_SIZE, max_delay=config.WRITE_FLUSH_SECONDS,
+                 max_retries=config.WRITE_MAX_RETRIES):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self._attempts = {}
+        self._retry = set()
+        self._after = {}
+        self._writing = set()
+        self._given_up = 0
+        self._pending = {}
+        self._pending_count = 0
+        self._oldest = None
+        self._in_flight = 0
+        self._closed = False
+        self._flush_requested = False
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="expense-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, expenses, username, month=None, year=None):
+        now = datetime.now()
+        month = month or now.month
+        year = year or now.year
+        expenses['timestamp'] = now.strftime("%Y-%m-%d %H:%M:%S")
+        expense_id = str(uuid.uuid4())
+
+        self._enqueue(username, [(year, month, expenses, expense_id)])
+        return expense_id
+
+    def _enqueue(self, username, rows, retry=False):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Expense write queue is closed")
+            self._pending.setdefault(username, []).extend(rows)
+            if retry:
+                self._retry.add(username)
+            self._pending_count += len(rows)
+            if self._oldest is None:
+                # Wake the worker so it starts the max_delay countdown
+                self._oldest = time.monotonic()
+                self._condition.notify_all()
+            elif self._pending_count >= self.max_batch:
+                self._condition.notify_all()
+
+    # Call callback() on the writer thread once the user's queued rows are
+    # written (or failed for good), or right away when none are queued
+    def after_write(self, username, callback):
+        with self._condition:
+            if username in self._pending or username in self._writing:
+                self._after.setdefault(username, []).append(callback)
+                return
+        callback()
+
+    def pending(self):
+        with self._condition:
+            return self._pending_count + self._in_flight
+
+    # Block until everything submitted so far has been written. Raises the
+    # last write error if rows had to be parked meanwhile, or if the timeout
+    # passes while writes are failing; returns False on a plain timeout.
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            given_up = self._given_up
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending_count or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    if self.last_error is not None and self._attempts:
+                        raise self.last_error
+                    return False
+                self._condition.wait(remaining)
+            if self._given_up != given_up:
+                raise self.last_error
+        return True
+
+    def close(self, timeout=None):
+        try:
+            self.flush(timeout)
+        except Exception:
+            # Already logged by the writer; whatever is left is parked below
+            pass
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        # Rows the writer did not get to are parked rather than dropped
+        with self._condition:
+            leftover, self._pending = self._pending, {}
+            self._pending_count = 0
+        for username, rows in leftover.items():
+            park_rows(username, rows)
+
+    def _due(self):
+        return (self._pending_count >= self.max_batch or self._flush_requested or self._closed or
+                (self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._due():
+                    wait = None if self._oldest is None else self.max_delay - (time.monotonic() - self._oldest)
+                    self._condition.wait(wait)
+                if self._closed and not self._pending_count:
+                    return
+                batch, self._pending = self._pending, {}
+                retry, self._retry = self._retry, set()
+                self._writing = set(batch)
+                self._in_flight, self._pending_count = self._pending_count, 0
+                self._oldest = None
+                self._flush_requested = False
+
+            failed = {}
+            for username, rows in batch.items():
+                try:
+                    storage.save_expense_batch(username, rows, rebuild=username in retry)
+                except Exception as e:
+                    logger.exception("Failed to write %d queued expenses for %s", len(rows), username)
+                    self.last_error = e
+                    failed[username] = rows
+
+            with self._condition:
+                for username in batch:
+                    if username not in failed:
+                        self._attempts.pop(username, None)
+                # Park rows that failed max_retries times (or any failure once
+                # closing), so a broken disk cannot keep the queue busy forever
+                parked = {}
+                for username, rows in failed.items():
+                    self._attempts[username] = self._attempts.get(username, 0) + 1
+                    if self._closed or self._attempts[username] >= self.max_retries:
+                        del self._attempts[username]
+                        parked[username] = rows
+            for username, rows in parked.items():
+                park_rows(username, rows)
+
+            with self._condition:
+                # Put other failed rows back in front of anything queued
+                # meanwhile and retry them on the next cycle
+                for username, rows in failed.items():
+                    if username not in parked:
+                        self._pending[username] = rows + self._pending.get(username, [])
+                        self._retry.add(username)
+                        self._pending_count += len(rows)
+                if len(parked) < len(failed):
+                    self._oldest = time.monotonic()
+                if parked:
+                    self._given_up += 1
+                self._in_flight = 0
+                self._writing = set()
+                callbacks = [callback for username in list(self._after) if username not in self._pending
+                             for callback in self._after.pop(username)]
+                self._condition.notify_all()
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("After-write callback failed")
+
+
+def unsent_path(username):
+    return os.path.join(storage.base_dir, f'{username}_unsent.jsonl')
+
+# Append rows that could not be written to the user's unsent file, so they
+# survive until a later queue retries them
+def park_rows(username, rows):
+    try:
+        with storage.user_lock(username):
+            with open(unsent_path(username), 'a') as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+                sync(f)
+        logger.error("Parked %d unwritten expenses for %s in %s", len(rows), username, unsent_path(username))
+    except OSError:
+        logger.exception("Could not park %d unwritten expenses for %s; they are lost", len(rows), username)
+
+# Move every parked row back into the queue. Rows keep their ids, so one
+# written twice (e.g. by two processes) is stored once, and they are queued as
+# a retry so the rollup and recent index are rebuilt rather than added to.
+def requeue_unsent(queue):
+    count = 0
+    for name in os.listdir(storage.base_dir):
+        if not name.endswith('_unsent.jsonl'):
+            continue
+        username = name[:-len('_unsent.jsonl')]
+        with storage.user_lock(username):
+            path = unsent_path(username)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r') as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            os.remove(path)
+        if rows:
+            queue._enqueue(username, [tuple(row) for row in rows], retry=True)
+            count += len(rows)
+    return count
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_write_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ExpenseWriteQueue()
+            # Flush whatever is still queued when the process shuts down
+            atexit.register(functools.partial(_queue.close, timeout=30))
+            requeue_unsent(_queue)
+        return _queue
+
+# Save an expense through the write queue when SMARTSPEND_WRITE_BEHIND is on,
+# otherwise synchronously; same arguments and return value as save_expenses
+def save_expenses_deferred(expenses, username, month=None, year=None):
+    if config.WRITE_BEHIND:
+        return get_write_queue().submit(expenses, username, month, year)
+    return storage.save_expenses(expenses, username, month, year)